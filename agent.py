@@ -6,19 +6,58 @@ This module provides a unified agent class that can work with all supported
 OpenAI models including GPT-4.1, GPT-4.1-mini, and GPT-4.1-nano.
 """
 
+import os
 import json
+import atexit
+import logging
+import weakref
 import yaml
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Generator, List, Dict, Any
-from dataclasses import asdict
+from typing import Optional, Generator, List, Dict, Any, Tuple
+from dataclasses import asdict, fields
+from operator import itemgetter
 
-from config import AgentConfig, ModelRegistry
+from config import AgentConfig, Message, ModelRegistry
 from utils import (
     DirectoryManager, LoggingManager, APIKeyManager, FileManager, 
     APIClient, ValidationUtils, ColorUtils
 )
 
+# Prefer libyaml's C implementation when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YLoader, CSafeDumper as _YDumper
+except ImportError:
+    from yaml import SafeLoader as _YLoader, SafeDumper as _YDumper
+
+# Use orjson for history serialization when available
+try:
+    import orjson
+    
+    def _dump_line(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    
+    _loads = orjson.loads
+except ImportError:
+    def _dump_line(obj: Any) -> bytes:
+        return (json.dumps(obj, ensure_ascii=False, default=Message.to_dict) + "\n").encode('utf-8')
+    
+    _loads = json.loads
+
+# On-disk history: one JSON message per line, appended on every turn
+HISTORY_FILE = "history.jsonl"
+LEGACY_HISTORY_FILE = "history.json"
+
+# Agents still alive at exit get their pending config written by one hook;
+# weak references keep the hook from pinning agents and their history
+_live_agents = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_live_agents():
+    for agent in list(_live_agents):
+        agent.flush_config()
+
 
 class UnifiedOpenAIAgent:
     """Unified OpenAI Chat Agent supporting multiple model variants"""
@@ -40,6 +79,7 @@ class UnifiedOpenAIAgent:
         
         self.agent_id = agent_id
         self.model = model
+        self._set_message_format()
         
         # Setup directory structure
         self.base_dir = DirectoryManager.setup_agent_directories(agent_id)
@@ -48,6 +88,7 @@ class UnifiedOpenAIAgent:
         self.logger = LoggingManager.setup_logger(agent_id, self.base_dir)
         
         # Load or create configuration
+        self._config_dirty = False
         self.config = self._load_config()
         
         # Ensure model matches the specified one
@@ -55,16 +96,32 @@ class UnifiedOpenAIAgent:
             self.config.model = model
             self._save_config()
         
-        # Load conversation history
-        self.messages = self._load_history()
+        # Conversation history is loaded on first access
+        self._history_lines = 0
+        self._messages: Optional[List[Message]] = None
+        self._lowered: Optional[List[str]] = None  # lowercased contents for search
+        self._api_messages: Optional[List[Optional[Dict[str, Any]]]] = None  # wrapped for the API
+        self._stats: Optional[Dict[str, Any]] = None  # running counters for get_statistics
         
         # Setup API key and client
         self.api_key = APIKeyManager.get_api_key(self.base_dir, model)
         self.api_client = APIClient(self.api_key, model, self.logger)
         
+        # Pending config edits from update_config are written at exit at the latest
+        _live_agents.add(self)
+        
         model_display = ModelRegistry.get_model_display_name(model)
         self.logger.info(f"Initialized Unified OpenAI Agent: {agent_id} with model: {model_display}")
     
+    def _set_message_format(self):
+        """Select how message content is shaped for the current model"""
+        # gpt-4.1-mini expects structured content parts instead of plain strings
+        self._needs_structured = self.model == "gpt-4.1-mini"
+        if self._needs_structured:
+            self._wrap = lambda text: [{"type": "text", "text": text}]
+        else:
+            self._wrap = lambda text: text
+    
     def _load_config(self) -> AgentConfig:
         """Load agent configuration from config.yaml"""
         config_file = self.base_dir / "config.yaml"
@@ -72,7 +129,7 @@ class UnifiedOpenAIAgent:
         if config_file.exists():
             try:
                 with open(config_file, 'r', encoding='utf-8') as f:
-                    config_data = yaml.safe_load(f)
+                    config_data = yaml.load(f, Loader=_YLoader)
                     return AgentConfig(**config_data)
             except Exception as e:
                 self.logger.error(f"Error loading config: {e}")
@@ -84,7 +141,8 @@ class UnifiedOpenAIAgent:
     
     def _save_config(self, config: Optional[AgentConfig] = None):
         """Save agent configuration to config.yaml"""
-        if config is None:
+        saving_current = config is None
+        if saving_current:
             config = self.config
         
         config.updated_at = datetime.now().isoformat()
@@ -92,55 +150,165 @@ class UnifiedOpenAIAgent:
         
         try:
             with open(config_file, 'w', encoding='utf-8') as f:
-                yaml.dump(asdict(config), f, default_flow_style=False, allow_unicode=True)
+                yaml.dump(asdict(config), f, Dumper=_YDumper, default_flow_style=False, allow_unicode=True)
+            if saving_current:
+                self._config_dirty = False
         except Exception as e:
             self.logger.error(f"Error saving config: {e}")
     
-    def _load_history(self) -> List[Dict[str, Any]]:
-        """Load conversation history from history.json"""
-        history_file = self.base_dir / "history.json"
+    def flush_config(self):
+        """Write config.yaml if update_config left unsaved changes"""
+        if self._config_dirty:
+            self._save_config()
+    
+    def close(self):
+        """Flush any pending state to disk and release the API connection"""
+        self.flush_config()
+        self.api_client.close()
+    
+    @property
+    def messages(self) -> List[Message]:
+        """Conversation history, loaded from disk on first access"""
+        if self._messages is None:
+            self._messages = self._load_history()
+        return self._messages
+    
+    def _load_history(self) -> List[Message]:
+        """Load conversation history from history.jsonl"""
+        history_file = self.base_dir / HISTORY_FILE
         
-        if history_file.exists():
-            try:
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                self.logger.error(f"Error loading history: {e}")
-                return []
-        return []
+        if not history_file.exists():
+            return self._migrate_legacy_history()
+        
+        messages = []
+        try:
+            with open(history_file, 'rb') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        messages.append(Message.from_dict(_loads(line)))
+                    except (json.JSONDecodeError, KeyError, TypeError) as e:
+                        self.logger.warning(f"Skipping malformed history line: {e}")
+        except Exception as e:
+            self.logger.error(f"Error loading history: {e}")
+            return []
+        
+        self._history_lines = len(messages)
+        
+        # Only the most recent messages are kept in memory
+        max_size = self.config.max_history_size
+        if len(messages) > max_size:
+            del messages[:-max_size]
+        return messages
     
-    def _save_history(self):
-        """Save conversation history to history.json with backup"""
-        history_file = self.base_dir / "history.json"
+    def _migrate_legacy_history(self) -> List[Message]:
+        """Convert a legacy history.json file to history.jsonl once"""
+        legacy_file = self.base_dir / LEGACY_HISTORY_FILE
         
-        # Create backup if history exists
-        if history_file.exists():
-            FileManager.create_backup(self.base_dir, "history.json")
+        if not legacy_file.exists():
+            return []
+        
+        try:
+            with open(legacy_file, 'rb') as f:
+                messages = [Message.from_dict(m) for m in _loads(f.read())]
+        except Exception as e:
+            self.logger.error(f"Error loading legacy history: {e}")
+            return []
+        
+        if self._write_history(messages):
+            FileManager.create_backup(self.base_dir, LEGACY_HISTORY_FILE)
+            legacy_file.unlink()
+            self.logger.info(f"Migrated {len(messages)} messages from {LEGACY_HISTORY_FILE} to {HISTORY_FILE}")
+        return messages
+    
+    def _write_history(self, messages: List[Message]) -> bool:
+        """Rewrite the whole history.jsonl file (used on truncation and clear)"""
+        history_file = self.base_dir / HISTORY_FILE
+        tmp_file = history_file.with_name(history_file.name + ".tmp")
         
         try:
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.messages, f, indent=2, ensure_ascii=False)
+            with open(tmp_file, 'wb') as f:
+                f.writelines(_dump_line(message) for message in messages)
+            os.replace(tmp_file, history_file)
+            self._history_lines = len(messages)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error saving history: {e}")
+            return False
+    
+    def _append_message(self, message: Message):
+        """Append a single message to history.jsonl"""
+        history_file = self.base_dir / HISTORY_FILE
+        
+        try:
+            with open(history_file, 'ab') as f:
+                f.write(_dump_line(message))
+            self._history_lines += 1
         except Exception as e:
             self.logger.error(f"Error saving history: {e}")
     
     def add_message(self, role: str, content: str, metadata: Optional[Dict[str, Any]] = None):
         """Add a message to conversation history"""
-        message = {
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "metadata": metadata or {}
-        }
+        message = Message(
+            role=role,
+            content=content,
+            timestamp=datetime.now().isoformat(timespec='seconds'),
+            metadata=metadata or {}
+        )
         
         self.messages.append(message)
+        self._append_message(message)
+        if self._lowered is not None:
+            self._lowered.append(content.lower())
+        if self._api_messages is not None:
+            self._api_messages.append(self._to_api_message(message))
+        if self._stats is not None:
+            self._tally_message(message, 1)
         
         # Truncate history if needed
-        if len(self.messages) > self.config.max_history_size:
-            removed = self.messages[:-self.config.max_history_size]
-            self.messages = self.messages[-self.config.max_history_size:]
-            self.logger.info(f"Truncated history: removed {len(removed)} old messages")
-        
-        self._save_history()
+        max_size = self.config.max_history_size
+        if len(self.messages) > max_size:
+            removed = len(self.messages) - max_size
+            if self._stats is not None:
+                for old in self.messages[:removed]:
+                    self._tally_message(old, -1)
+            del self.messages[:-max_size]
+            if self._stats is not None:
+                self._stats["first_ts"] = self.messages[0].timestamp
+            if self._lowered is not None:
+                del self._lowered[:-max_size]
+            if self._api_messages is not None:
+                del self._api_messages[:-max_size]
+            self.logger.info(f"Truncated history: removed {removed} old messages")
+        
+        # Compact the on-disk log once it holds twice the retained history
+        if self._history_lines > 2 * max_size:
+            self._write_history(self.messages)
+    
+    def _tally_message(self, msg: Message, sign: int):
+        """Add (sign=1) or remove (sign=-1) a message from the running statistics"""
+        stats = self._stats
+        stats["chars"] += sign * len(msg.content)
+        if msg.role in ("user", "assistant"):
+            stats[msg.role] += sign
+        if sign > 0:
+            stats["last_ts"] = msg.timestamp
+            if not stats["first_ts"]:
+                stats["first_ts"] = msg.timestamp
+    
+    def _build_stats(self):
+        """Compute the running statistics from the retained history in one pass"""
+        self._stats = {"user": 0, "assistant": 0, "chars": 0, "first_ts": None, "last_ts": None}
+        for msg in self.messages:
+            self._tally_message(msg, 1)
+    
+    def _to_api_message(self, msg: Message) -> Optional[Dict[str, Any]]:
+        """Shape a history message for the API, or None if its role is not sent"""
+        if msg.role not in ("user", "assistant"):
+            return None
+        return {"role": msg.role, "content": self._wrap(msg.content)}
     
     def _build_api_payload(self, new_message: str, override_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Build the API request payload based on model type"""
@@ -148,68 +316,55 @@ class UnifiedOpenAIAgent:
         processed_message = FileManager.process_file_inclusions(new_message, self.base_dir, self.logger)
         
         # Build messages array
+        wrap = self._wrap
         messages = []
         
         # Add system prompt if configured
         if self.config.system_prompt:
-            system_message = {"role": "system", "content": self.config.system_prompt}
-            
-            # Use structured format for gpt-4.1-mini
-            if self.model == "gpt-4.1-mini":
-                system_message["content"] = [{"type": "text", "text": self.config.system_prompt}]
-            
-            messages.append(system_message)
+            messages.append({"role": "system", "content": wrap(self.config.system_prompt)})
         
-        # Add conversation history
-        for msg in self.messages:
-            if msg["role"] in ["user", "assistant"]:
-                message_content = {"role": msg["role"], "content": msg["content"]}
-                
-                # Use structured format for gpt-4.1-mini
-                if self.model == "gpt-4.1-mini":
-                    message_content["content"] = [{"type": "text", "text": msg["content"]}]
-                
-                messages.append(message_content)
+        # Add conversation history (wrapped once per message, kept in sync by add_message)
+        if self._api_messages is None:
+            self._api_messages = [self._to_api_message(msg) for msg in self.messages]
+        messages.extend(filter(None, self._api_messages))
         
         # Add new user message
-        user_message = {"role": "user", "content": processed_message}
-        
-        # Use structured format for gpt-4.1-mini
-        if self.model == "gpt-4.1-mini":
-            user_message["content"] = [{"type": "text", "text": processed_message}]
+        messages.append({"role": "user", "content": wrap(processed_message)})
         
-        messages.append(user_message)
-        
-        # Apply config overrides
-        config = asdict(self.config)
+        # Apply config overrides without copying the whole config
         if override_config:
-            config.update(override_config)
+            get = lambda key: override_config.get(key, getattr(self.config, key))
+        else:
+            get = lambda key: getattr(self.config, key)
         
         # Build payload based on model type
         payload = {
-            "model": config["model"],
+            "model": get("model"),
             "messages": messages,
-            "temperature": config["temperature"],
-            "top_p": config["top_p"],
-            "frequency_penalty": config["frequency_penalty"],
-            "presence_penalty": config["presence_penalty"],
+            "temperature": get("temperature"),
+            "top_p": get("top_p"),
+            "frequency_penalty": get("frequency_penalty"),
+            "presence_penalty": get("presence_penalty"),
         }
         
         # Add max_tokens (different parameter names for different models)
-        if self.model == "gpt-4.1-mini":
-            payload["max_completion_tokens"] = config["max_tokens"]
-            payload["response_format"] = {"type": config["response_format"]}
+        if self._needs_structured:
+            payload["max_completion_tokens"] = get("max_tokens")
+            payload["response_format"] = {"type": get("response_format")}
         else:
-            payload["max_tokens"] = config["max_tokens"]
+            payload["max_tokens"] = get("max_tokens")
         
         # Add streaming if enabled
-        if config["stream"]:
+        if get("stream"):
             payload["stream"] = True
         
         return payload
     
     def call_api(self, new_message: str, override_config: Optional[Dict[str, Any]] = None) -> Generator[str, None, None]:
         """Call OpenAI API with the new message"""
+        # Persist pending config edits before potentially long network I/O
+        self.flush_config()
+        
         try:
             # Add user message to history
             self.add_message("user", new_message)
@@ -218,7 +373,8 @@ class UnifiedOpenAIAgent:
             payload = self._build_api_payload(new_message, override_config)
             
             self.logger.info(f"Making API call to {self.api_client.api_url}")
-            self.logger.debug(f"Payload: {json.dumps(payload, indent=2)}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("Payload: %s", json.dumps(payload, indent=2))
             
             # Show model info to user
             model_display = ModelRegistry.get_model_display_name(self.model)
@@ -252,9 +408,14 @@ class UnifiedOpenAIAgent:
     
     def clear_history(self):
         """Clear conversation history"""
-        FileManager.create_backup(self.base_dir, "history.json")
-        self.messages.clear()
-        self._save_history()
+        # Loading migrates a legacy history.json, so the backup has a file to copy
+        self.messages
+        FileManager.create_backup(self.base_dir, HISTORY_FILE)
+        self._messages = []
+        self._lowered = []
+        self._api_messages = []
+        self._build_stats()
+        self._write_history(self._messages)
         self.logger.info("Conversation history cleared")
     
     def get_statistics(self) -> Dict[str, Any]:
@@ -271,22 +432,22 @@ class UnifiedOpenAIAgent:
                 "conversation_duration": None
             }
         
-        user_msgs = [m for m in self.messages if m["role"] == "user"]
-        assistant_msgs = [m for m in self.messages if m["role"] == "assistant"]
-        
-        total_chars = sum(len(m["content"]) for m in self.messages)
-        avg_length = total_chars // len(self.messages) if self.messages else 0
+        # Counters are kept up to date by add_message; only built once per history
+        if self._stats is None:
+            self._build_stats()
+        stats = self._stats
+        total = len(self.messages)
         
-        first_time = datetime.fromisoformat(self.messages[0]["timestamp"])
-        last_time = datetime.fromisoformat(self.messages[-1]["timestamp"])
+        first_time = datetime.fromisoformat(stats["first_ts"])
+        last_time = datetime.fromisoformat(stats["last_ts"])
         duration = last_time - first_time
         
         return {
-            "total_messages": len(self.messages),
-            "user_messages": len(user_msgs),
-            "assistant_messages": len(assistant_msgs),
-            "total_characters": total_chars,
-            "average_message_length": avg_length,
+            "total_messages": total,
+            "user_messages": stats["user"],
+            "assistant_messages": stats["assistant"],
+            "total_characters": stats["chars"],
+            "average_message_length": stats["chars"] // total,
             "first_message": first_time.strftime("%Y-%m-%d %H:%M:%S"),
             "last_message": last_time.strftime("%Y-%m-%d %H:%M:%S"),
             "conversation_duration": str(duration).split('.')[0] if duration.total_seconds() > 0 else "0:00:00"
@@ -297,12 +458,18 @@ class UnifiedOpenAIAgent:
         results = []
         term_lower = term.lower()
         
-        for i, msg in enumerate(self.messages):
-            if term_lower in msg["content"].lower():
+        # Lowercase each message once, then keep the index in sync in add_message
+        messages = self.messages
+        if self._lowered is None:
+            self._lowered = [msg.content.lower() for msg in messages]
+        
+        for i, content_lower in enumerate(self._lowered):
+            if term_lower in content_lower:
+                msg = messages[i]
                 results.append({
                     "index": i,
                     "message": msg,
-                    "preview": msg["content"][:100] + "..." if len(msg["content"]) > 100 else msg["content"]
+                    "preview": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
                 })
             
             if len(results) >= limit:
@@ -316,10 +483,10 @@ class UnifiedOpenAIAgent:
     
     def update_config(self, **kwargs):
         """Update agent configuration"""
-        config_dict = asdict(self.config)
+        config_fields = {f.name for f in fields(self.config)}
         
         for key, value in kwargs.items():
-            if key in config_dict:
+            if key in config_fields:
                 # Validate specific fields
                 if key == "temperature" and not ValidationUtils.validate_temperature(value):
                     raise ValueError(f"Invalid temperature value: {value}")
@@ -332,7 +499,8 @@ class UnifiedOpenAIAgent:
             else:
                 raise ValueError(f"Unknown configuration key: {key}")
         
-        self._save_config()
+        # Written in one go by flush_config (next API call, close() or exit)
+        self._config_dirty = True
         self.logger.info(f"Configuration updated: {kwargs}")
     
     def get_model_info(self) -> Dict[str, Any]:
@@ -347,9 +515,11 @@ class UnifiedOpenAIAgent:
         old_model = self.model
         self.model = new_model
         self.config.model = new_model
+        self._set_message_format()
+        self._api_messages = None  # content wrapping may differ for the new model
         
-        # Update API client
-        self.api_client = APIClient(self.api_key, new_model, self.logger)
+        # Update API client (keeping its pooled connection)
+        self.api_client.model = new_model
         
         self._save_config()
         
@@ -373,6 +543,47 @@ class UnifiedOpenAIAgent:
         return issues
 
 
+def _find_history_file(agent_dir: Path) -> Optional[Path]:
+    """Return the agent's history file, preferring the JSONL log over legacy JSON"""
+    for name in (HISTORY_FILE, LEGACY_HISTORY_FILE):
+        history_file = agent_dir / name
+        if history_file.exists():
+            return history_file
+    return None
+
+
+def _read_history_file(history_file: Path) -> List[Dict[str, Any]]:
+    """Read messages from a history.jsonl or legacy history.json file"""
+    with open(history_file, 'rb') as f:
+        if history_file.suffix != ".jsonl":
+            return _loads(f.read())
+        return [_loads(line) for line in f if line.strip()]
+
+
+def _count_history_messages(history_file: Path) -> int:
+    """Count messages in a history file without parsing JSONL records"""
+    if history_file.suffix != ".jsonl":
+        return len(_read_history_file(history_file))
+    
+    # Every JSONL record is written newline-terminated, so count newlines
+    with open(history_file, 'rb') as f:
+        return sum(chunk.count(b"\n") for chunk in iter(lambda: f.read(1 << 16), b""))
+
+
+def _scan_files(root: Path) -> List[Tuple[Path, int]]:
+    """Recursively collect (path, size) for files under root using os.scandir"""
+    files = []
+    pending = [root]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(Path(entry.path))
+                elif entry.is_file():
+                    files.append((Path(entry.path), entry.stat().st_size))
+    return files
+
+
 def list_agents() -> List[Dict[str, Any]]:
     """List all available agents"""
     agents_dir = Path("agents")
@@ -381,34 +592,42 @@ def list_agents() -> List[Dict[str, Any]]:
     if not agents_dir.exists():
         return agents
     
-    for agent_dir in agents_dir.iterdir():
-        if agent_dir.is_dir():
+    with os.scandir(agents_dir) as agent_entries:
+        for agent_entry in agent_entries:
+            if not agent_entry.is_dir():
+                continue
+            
+            agent_dir = Path(agent_entry.path)
             agent_info = {
-                "id": agent_dir.name,
+                "id": agent_entry.name,
                 "path": str(agent_dir),
                 "exists": True
             }
             
+            # One directory listing replaces per-file exists()/stat() calls
+            with os.scandir(agent_dir) as file_entries:
+                files = {entry.name: entry for entry in file_entries if entry.is_file()}
+            
             # Load configuration info
-            config_file = agent_dir / "config.yaml"
-            if config_file.exists():
+            max_history_size = AgentConfig.max_history_size
+            if "config.yaml" in files:
                 try:
-                    with open(config_file) as f:
-                        config = yaml.safe_load(f)
+                    with open(files["config.yaml"].path) as f:
+                        config = yaml.load(f, Loader=_YLoader)
                         agent_info["model"] = config.get("model", "gpt-4.1")
                         agent_info["created_at"] = config.get("created_at")
                         agent_info["updated_at"] = config.get("updated_at")
+                        max_history_size = config.get("max_history_size", max_history_size)
                 except:
                     pass
             
             # Load history info
-            history_file = agent_dir / "history.json"
-            if history_file.exists():
+            history_entry = files.get(HISTORY_FILE) or files.get(LEGACY_HISTORY_FILE)
+            if history_entry:
                 try:
-                    with open(history_file) as f:
-                        history = json.load(f)
-                        agent_info["message_count"] = len(history)
-                        agent_info["history_size"] = history_file.stat().st_size
+                    message_count = _count_history_messages(Path(history_entry.path))
+                    agent_info["message_count"] = min(message_count, max_history_size)
+                    agent_info["history_size"] = history_entry.stat().st_size
                 except:
                     agent_info["message_count"] = 0
                     agent_info["history_size"] = 0
@@ -416,9 +635,10 @@ def list_agents() -> List[Dict[str, Any]]:
                 agent_info["message_count"] = 0
                 agent_info["history_size"] = 0
             
-            agents.append(agent_info)
+            agents.append((agent_info.get("updated_at") or "", agent_info))
     
-    return sorted(agents, key=lambda x: x.get("updated_at", ""))
+    agents.sort(key=itemgetter(0))
+    return [agent_info for _, agent_info in agents]
 
 
 def show_agent_info(agent_id: str):
@@ -434,11 +654,12 @@ def show_agent_info(agent_id: str):
     print(f"{ColorUtils.info('='*50)}")
     
     # Load and display config
+    config = {}
     config_file = agent_dir / "config.yaml"
     if config_file.exists():
         try:
             with open(config_file) as f:
-                config = yaml.safe_load(f)
+                config = yaml.load(f, Loader=_YLoader) or {}
             
             model = config.get('model', 'gpt-4.1')
             model_display = ModelRegistry.get_model_display_name(model)
@@ -455,15 +676,22 @@ def show_agent_info(agent_id: str):
             print(ColorUtils.error(f"Error loading config: {e}"))
     
     # Display history stats
-    history_file = agent_dir / "history.json"
-    if history_file.exists():
+    history_file = _find_history_file(agent_dir)
+    if history_file:
         try:
-            with open(history_file) as f:
-                history = json.load(f)
+            history = _read_history_file(history_file)
+            max_history_size = config.get('max_history_size')
+            if max_history_size and len(history) > max_history_size:
+                history = history[-max_history_size:]
             
-            user_msgs = len([m for m in history if m.get("role") == "user"])
-            assistant_msgs = len([m for m in history if m.get("role") == "assistant"])
-            total_chars = sum(len(m.get("content", "")) for m in history)
+            user_msgs = assistant_msgs = total_chars = 0
+            for m in history:
+                role = m.get("role")
+                total_chars += len(m.get("content", ""))
+                if role == "user":
+                    user_msgs += 1
+                elif role == "assistant":
+                    assistant_msgs += 1
             
             print(f"\n{ColorUtils.success('Conversation History:')}")
             print(f"  Total Messages: {len(history)}")
@@ -485,9 +713,7 @@ def show_agent_info(agent_id: str):
     
     # Display directory structure
     print(f"\n{ColorUtils.success('Directory Structure:')}")
-    for item in sorted(agent_dir.rglob("*")):
-        if item.is_file():
-            size = item.stat().st_size
-            size_str = f"{size:,}" if size < 1024 else f"{size/1024:.1f}K"
-            rel_path = item.relative_to(agent_dir)
-            print(f"  {rel_path} ({size_str} bytes)")
\ No newline at end of file
+    for item, size in sorted(_scan_files(agent_dir)):
+        size_str = f"{size:,}" if size < 1024 else f"{size/1024:.1f}K"
+        rel_path = item.relative_to(agent_dir)
+        print(f"  {rel_path} ({size_str} bytes)")
\ No newline at end of file
@@ -6,7 +6,10 @@ This module provides configuration management for all supported OpenAI models
 including GPT-4.1, GPT-4.1-mini, and GPT-4.1-nano variants.
 """
 
-from dataclasses import dataclass, asdict
+import sys
+from dataclasses import dataclass, asdict, field
+from functools import lru_cache
+from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
 
@@ -29,9 +32,37 @@ class AgentConfig:
 
     def __post_init__(self):
         """Initialize timestamps"""
+        now = datetime.now().isoformat()
         if not self.created_at:
-            self.created_at = datetime.now().isoformat()
-        self.updated_at = datetime.now().isoformat()
+            self.created_at = now
+        self.updated_at = now
+
+
+@dataclass(slots=True)
+class Message:
+    """A single entry in an agent's conversation history"""
+    role: str
+    content: str
+    timestamp: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        """Intern the role so every message shares one string per role"""
+        self.role = sys.intern(self.role)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Message":
+        """Build a message from its serialized history form"""
+        return cls(data["role"], data["content"], data["timestamp"], data.get("metadata") or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the message to a plain dict"""
+        return {
+            "role": self.role,
+            "content": self.content,
+            "timestamp": self.timestamp,
+            "metadata": self.metadata
+        }
 
 
 class ModelRegistry:
@@ -71,7 +102,7 @@ class ModelRegistry:
     }
 
     # Programming and common file extensions supported for file inclusion
-    SUPPORTED_EXTENSIONS = {
+    SUPPORTED_EXTENSIONS = frozenset({
         # Programming languages
         '.py', '.r', '.js', '.ts', '.jsx', '.tsx', '.java', '.c', '.cpp', '.cc', '.cxx',
         '.h', '.hpp', '.cs', '.php', '.rb', '.go', '.rs', '.swift', '.kt', '.scala',
@@ -102,24 +133,38 @@ class ModelRegistry:
         # Other useful formats
         '.editorconfig', '.gitignore', '.gitattributes', '.dockerignore', '.eslintrc',
         '.prettierrc', '.babelrc', '.webpack', '.rollup', '.vite', '.parcel'
-    }
+    })
+
+    # Files without extensions but with known names
+    KNOWN_FILES = frozenset({
+        'makefile', 'dockerfile', 'rakefile', 'gemfile', 'podfile',
+        'readme', 'license', 'changelog', 'authors', 'contributors',
+        'todo', 'manifest', 'requirements', 'pipfile', 'poetry'
+    })
+
+    # Lowercased once so suffix checks don't rebuild it per file
+    _EXTENSIONS_LOWER = frozenset(ext.lower() for ext in SUPPORTED_EXTENSIONS)
 
     @classmethod
+    @lru_cache(maxsize=16)
     def get_model_info(cls, model: str) -> Dict[str, Any]:
         """Get information about a specific model"""
         return cls.SUPPORTED_MODELS.get(model, {})
 
     @classmethod
+    @lru_cache(maxsize=16)
     def get_model_timeout(cls, model: str) -> int:
         """Get timeout for a specific model"""
         return cls.get_model_info(model).get('timeout', 120)
 
     @classmethod
+    @lru_cache(maxsize=16)
     def get_model_display_name(cls, model: str) -> str:
         """Get display name for a specific model"""
         return cls.get_model_info(model).get('name', model)
 
     @classmethod
+    @lru_cache(maxsize=16)
     def is_valid_model(cls, model: str) -> bool:
         """Check if model is supported"""
         return model in cls.SUPPORTED_MODELS
@@ -130,38 +175,43 @@ class ModelRegistry:
         return list(cls.SUPPORTED_MODELS.keys())
 
     @classmethod
-    def get_default_config(cls, model: str) -> AgentConfig:
-        """Get default configuration for a specific model"""
+    @lru_cache(maxsize=8)
+    def _default_config_fields(cls, model: str) -> Dict[str, Any]:
+        """Get the model-specific default field values (cached per model)"""
         if not cls.is_valid_model(model):
             model = "gpt-4.1"
         
         model_info = cls.get_model_info(model)
-        return AgentConfig(
-            model=model,
-            max_tokens=model_info.get('max_tokens', 32768),
-        )
+        return {
+            "model": model,
+            "max_tokens": model_info.get('max_tokens', 32768),
+        }
+
+    @classmethod
+    def get_default_config(cls, model: str) -> AgentConfig:
+        """Get default configuration for a specific model"""
+        # Timestamps are left out of the cached fields so each config gets fresh ones
+        return AgentConfig(**cls._default_config_fields(model))
+
+    @classmethod
+    @lru_cache(maxsize=4096)
+    def _is_supported_suffix(cls, suffix: str) -> bool:
+        """Check a raw file suffix against the lowercased extension set"""
+        return suffix.lower() in cls._EXTENSIONS_LOWER
 
     @classmethod
     def is_supported_file(cls, file_path) -> bool:
         """Check if file extension is supported for inclusion"""
-        from pathlib import Path
-        
         if hasattr(file_path, 'suffix'):
             path_obj = file_path
         else:
             path_obj = Path(file_path)
         
-        if path_obj.suffix.lower() in cls.SUPPORTED_EXTENSIONS:
+        if path_obj.suffix and cls._is_supported_suffix(path_obj.suffix):
             return True
 
         # Check for files without extensions but with known names
-        known_files = {
-            'makefile', 'dockerfile', 'rakefile', 'gemfile', 'podfile',
-            'readme', 'license', 'changelog', 'authors', 'contributors',
-            'todo', 'manifest', 'requirements', 'pipfile', 'poetry'
-        }
-
-        return path_obj.name.lower() in known_files
+        return path_obj.name.lower() in cls.KNOWN_FILES
 
 
 # Default search paths for file inclusion
@@ -10,212 +10,38 @@ import json
 import html
 import re
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List
-from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, TextIO, Tuple
+from dataclasses import asdict, fields
+from functools import lru_cache
 
-from config import ModelRegistry, EXPORT_FORMATS
+from config import Message, ModelRegistry, EXPORT_FORMATS
 from utils import ColorUtils
 
-
-class ConversationExporter:
-    """Handles exporting conversations to various formats"""
-    
-    def __init__(self, agent_id: str, base_dir: Path, config: Any, messages: List[Dict[str, Any]]):
-        self.agent_id = agent_id
-        self.base_dir = base_dir
-        self.config = config
-        self.messages = messages
-        self.export_dir = base_dir / "exports"
-        
-        # Ensure export directory exists
-        self.export_dir.mkdir(exist_ok=True)
-    
-    def export_conversation(self, format_type: str) -> str:
-        """Export conversation to specified format"""
-        if format_type not in EXPORT_FORMATS:
-            raise ValueError(f"Unsupported export format: {format_type}. Supported: {list(EXPORT_FORMATS.keys())}")
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        extension = EXPORT_FORMATS[format_type]['extension']
-        filename = f"conversation_{timestamp}{extension}"
-        filepath = self.export_dir / filename
-        
-        # Route to appropriate export method
-        export_methods = {
-            'json': self._export_json,
-            'txt': self._export_txt,
-            'md': self._export_markdown,
-            'html': self._export_html
-        }
-        
-        export_methods[format_type](filepath)
-        return str(filepath)
-    
-    def _export_json(self, filepath: Path):
-        """Export conversation as JSON with full metadata"""
-        stats = self._calculate_statistics()
-        model_display = ModelRegistry.get_model_display_name(self.config.model)
-        
-        export_data = {
-            "agent_id": self.agent_id,
-            "exported_at": datetime.now().isoformat(),
-            "model": {
-                "name": self.config.model,
-                "display_name": model_display,
-                "info": ModelRegistry.get_model_info(self.config.model)
-            },
-            "config": asdict(self.config),
-            "messages": self.messages,
-            "statistics": stats,
-            "export_info": {
-                "format": "json",
-                "version": "1.0",
-                "total_messages": len(self.messages),
-                "file_size_bytes": 0  # Will be calculated after writing
-            }
-        }
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
-        
-        # Update file size in metadata (for future reference)
-        export_data["export_info"]["file_size_bytes"] = filepath.stat().st_size
-    
-    def _export_txt(self, filepath: Path):
-        """Export conversation as plain text"""
-        model_display = ModelRegistry.get_model_display_name(self.config.model)
-        stats = self._calculate_statistics()
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Header
-            f.write("OpenAI Unified Agent Conversation Export\n")
-            f.write("=" * 50 + "\n\n")
-            f.write(f"Agent ID: {self.agent_id}\n")
-            f.write(f"Model: {self.config.model} ({model_display})\n")
-            f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total Messages: {stats['total_messages']}\n")
-            f.write(f"Conversation Duration: {stats['conversation_duration']}\n")
-            f.write("\n" + "=" * 50 + "\n\n")
-            
-            # Configuration
-            f.write("CONFIGURATION:\n")
-            f.write("-" * 20 + "\n")
-            config_dict = asdict(self.config)
-            for key, value in config_dict.items():
-                if key not in ['created_at', 'updated_at']:
-                    f.write(f"{key.replace('_', ' ').title()}: {value}\n")
-            f.write("\n")
-            
-            # Statistics
-            f.write("STATISTICS:\n")
-            f.write("-" * 20 + "\n")
-            for key, value in stats.items():
-                if value is not None:
-                    display_key = key.replace('_', ' ').title()
-                    f.write(f"{display_key}: {value}\n")
-            f.write("\n" + "=" * 50 + "\n\n")
-            
-            # Messages
-            f.write("CONVERSATION:\n")
-            f.write("-" * 20 + "\n\n")
-            
-            for i, msg in enumerate(self.messages, 1):
-                timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-                role = msg["role"].upper()
-                content = msg["content"]
-                
-                f.write(f"[{i:03d}] [{timestamp}] {role}:\n")
-                f.write("-" * 40 + "\n")
-                f.write(f"{content}\n\n")
-    
-    def _export_markdown(self, filepath: Path):
-        """Export conversation as Markdown"""
-        model_display = ModelRegistry.get_model_display_name(self.config.model)
-        stats = self._calculate_statistics()
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            # Header
-            f.write(f"# 🤖 OpenAI {model_display} Conversation\n\n")
-            f.write(f"**Agent ID:** `{self.agent_id}`  \n")
-            f.write(f"**Model:** `{self.config.model}`  \n")
-            f.write(f"**Export Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n")
-            f.write(f"**Total Messages:** {stats['total_messages']}  \n\n")
-            
-            # Model Information
-            model_info = ModelRegistry.get_model_info(self.config.model)
-            if model_info:
-                f.write("## 📊 Model Information\n\n")
-                f.write(f"- **Name:** {model_info.get('name', 'Unknown')}\n")
-                f.write(f"- **Description:** {model_info.get('description', 'No description')}\n")
-                f.write(f"- **Timeout:** {model_info.get('timeout', 'Unknown')}s\n")
-                f.write(f"- **Max Tokens:** {model_info.get('max_tokens', 'Unknown')}\n")
-                f.write(f"- **Cost Tier:** {model_info.get('cost_tier', 'Unknown').title()}\n\n")
-            
-            # Configuration
-            f.write("## ⚙️ Configuration\n\n")
-            config_dict = asdict(self.config)
-            for key, value in config_dict.items():
-                if key not in ['created_at', 'updated_at'] and value is not None:
-                    display_key = key.replace('_', ' ').title()
-                    f.write(f"- **{display_key}:** `{value}`\n")
-            f.write("\n")
-            
-            # Statistics
-            f.write("## 📈 Statistics\n\n")
-            f.write("| Metric | Value |\n")
-            f.write("|--------|-------|\n")
-            for key, value in stats.items():
-                if value is not None:
-                    display_key = key.replace('_', ' ').title()
-                    if isinstance(value, int) and key != 'conversation_duration':
-                        f.write(f"| {display_key} | {value:,} |\n")
-                    else:
-                        f.write(f"| {display_key} | {value} |\n")
-            f.write("\n")
-            
-            # Conversation
-            f.write("## 💬 Conversation\n\n")
-            
-            for i, msg in enumerate(self.messages, 1):
-                timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-                role = msg["role"]
-                content = msg["content"]
-                
-                # Role emoji and styling
-                if role == "user":
-                    role_emoji = "👤"
-                    role_display = "User"
-                elif role == "assistant":
-                    role_emoji = "🤖"
-                    role_display = "Assistant"
-                else:
-                    role_emoji = "ℹ️"
-                    role_display = role.title()
-                
-                f.write(f"### {role_emoji} {role_display} - Message {i}\n")
-                f.write(f"*{timestamp}*\n\n")
-                
-                # Format content - handle code blocks properly
-                formatted_content = self._format_markdown_content(content)
-                f.write(f"{formatted_content}\n\n")
-                f.write("---\n\n")
+# Use orjson for JSON exports when available
+try:
+    import orjson
     
-    def _export_html(self, filepath: Path):
-        """Export conversation as HTML with modern styling"""
-        model_display = ModelRegistry.get_model_display_name(self.config.model)
-        stats = self._calculate_statistics()
-        model_info = ModelRegistry.get_model_info(self.config.model)
-        
-        # Modern HTML template with enhanced styling
-        html_content = f"""<!DOCTYPE html>
+    def _dump_json(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dump_json(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False, default=Message.to_dict).encode('utf-8')
+
+
+# Document head up to the opening <style> tag
+_HTML_HEAD_FMT = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>🤖 OpenAI {model_display} Conversation - {self.agent_id}</title>
+    <title>🤖 OpenAI {model_display} Conversation - {agent_id}</title>
     <style>
-        :root {{
+"""
+
+# Stylesheet for HTML exports; a plain string so it is not re-scanned as an f-string each export
+_HTML_CSS = """\
+        :root {
             --primary-color: #2563eb;
             --secondary-color: #f1f5f9;
             --success-color: #10b981;
@@ -229,41 +55,41 @@ class ConversationExporter:
             --code-bg: #f8fafc;
             --shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1), 0 2px 4px -1px rgba(0, 0, 0, 0.06);
             --shadow-lg: 0 20px 25px -5px rgba(0, 0, 0, 0.1), 0 10px 10px -5px rgba(0, 0, 0, 0.04);
-        }}
+        }
 
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Roboto', 'Oxygen', sans-serif;
             line-height: 1.6;
             color: var(--text-color);
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
             padding: 1rem;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 1200px;
             margin: 0 auto;
             background: white;
             border-radius: 1rem;
             box-shadow: var(--shadow-lg);
             overflow: hidden;
-        }}
+        }
 
-        .header {{
+        .header {
             background: var(--primary-color);
             color: white;
             padding: 2rem;
             text-align: center;
             position: relative;
-        }}
+        }
 
-        .header::before {{
+        .header::before {
             content: '';
             position: absolute;
             top: 0;
@@ -272,157 +98,157 @@ class ConversationExporter:
             bottom: 0;
             background: url('data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 100 100"><circle cx="20" cy="20" r="2" fill="rgba(255,255,255,0.1)"/><circle cx="80" cy="40" r="1.5" fill="rgba(255,255,255,0.1)"/><circle cx="40" cy="80" r="1" fill="rgba(255,255,255,0.1)"/></svg>');
             opacity: 0.3;
-        }}
+        }
 
-        .header-content {{
+        .header-content {
             position: relative;
             z-index: 1;
-        }}
+        }
 
-        .header h1 {{
+        .header h1 {
             font-size: 2.5rem;
             margin-bottom: 0.5rem;
             font-weight: 700;
-        }}
+        }
 
-        .header-subtitle {{
+        .header-subtitle {
             font-size: 1.1rem;
             opacity: 0.9;
             margin-bottom: 1.5rem;
-        }}
+        }
 
-        .header-info {{
+        .header-info {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
             font-size: 0.9rem;
-        }}
+        }
 
-        .header-info-item {{
+        .header-info-item {
             background: rgba(255, 255, 255, 0.1);
             padding: 0.75rem 1rem;
             border-radius: 0.5rem;
             backdrop-filter: blur(10px);
-        }}
+        }
 
-        .model-info {{
+        .model-info {
             background: var(--secondary-color);
             padding: 2rem;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
 
-        .model-info h2 {{
+        .model-info h2 {
             margin-bottom: 1rem;
             color: var(--primary-color);
             display: flex;
             align-items: center;
             gap: 0.5rem;
-        }}
+        }
 
-        .info-grid {{
+        .info-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
             gap: 1rem;
-        }}
+        }
 
-        .info-card {{
+        .info-card {
             background: white;
             padding: 1.5rem;
             border-radius: 0.75rem;
             box-shadow: var(--shadow);
             border-left: 4px solid var(--primary-color);
-        }}
+        }
 
-        .info-card h3 {{
+        .info-card h3 {
             font-size: 0.9rem;
             font-weight: 600;
             color: var(--text-secondary);
             margin-bottom: 0.5rem;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .info-card-value {{
+        .info-card-value {
             font-size: 1.25rem;
             font-weight: 700;
             color: var(--primary-color);
-        }}
+        }
 
-        .stats {{
+        .stats {
             background: var(--secondary-color);
             padding: 2rem;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
 
-        .stats h2 {{
+        .stats h2 {
             margin-bottom: 1.5rem;
             color: var(--primary-color);
             display: flex;
             align-items: center;
             gap: 0.5rem;
-        }}
+        }
 
-        .stats-grid {{
+        .stats-grid {
             display: grid;
             grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
             gap: 1rem;
-        }}
+        }
 
-        .stat-card {{
+        .stat-card {
             background: white;
             padding: 1.5rem;
             border-radius: 0.75rem;
             text-align: center;
             box-shadow: var(--shadow);
             transition: transform 0.2s ease, box-shadow 0.2s ease;
-        }}
+        }
 
-        .stat-card:hover {{
+        .stat-card:hover {
             transform: translateY(-2px);
             box-shadow: var(--shadow-lg);
-        }}
+        }
 
-        .stat-value {{
+        .stat-value {
             font-size: 2rem;
             font-weight: 800;
             color: var(--primary-color);
             margin-bottom: 0.25rem;
-        }}
+        }
 
-        .stat-label {{
+        .stat-label {
             font-size: 0.8rem;
             color: var(--text-secondary);
             font-weight: 500;
             text-transform: uppercase;
             letter-spacing: 0.5px;
-        }}
+        }
 
-        .messages {{
+        .messages {
             padding: 2rem;
             background: #fafbfc;
-        }}
+        }
 
-        .messages h2 {{
+        .messages h2 {
             margin-bottom: 2rem;
             color: var(--primary-color);
             display: flex;
             align-items: center;
             gap: 0.5rem;
-        }}
+        }
 
-        .message {{
+        .message {
             margin-bottom: 2rem;
             display: flex;
             align-items: flex-start;
             gap: 1rem;
             animation: fadeIn 0.3s ease-in;
-        }}
+        }
 
-        .message.user {{
+        .message.user {
             flex-direction: row-reverse;
-        }}
+        }
 
-        .message-avatar {{
+        .message-avatar {
             width: 3rem;
             height: 3rem;
             border-radius: 50%;
@@ -434,93 +260,93 @@ class ConversationExporter:
             color: white;
             flex-shrink: 0;
             box-shadow: var(--shadow);
-        }}
+        }
 
-        .message.user .message-avatar {{
+        .message.user .message-avatar {
             background: var(--user-bg);
-        }}
+        }
 
-        .message.assistant .message-avatar {{
+        .message.assistant .message-avatar {
             background: var(--assistant-bg);
-        }}
+        }
 
-        .message-content {{
+        .message-content {
             flex: 1;
             max-width: 70%;
-        }}
+        }
 
-        .message-bubble {{
+        .message-bubble {
             background: white;
             padding: 1.5rem;
             border-radius: 1rem;
             box-shadow: var(--shadow);
             position: relative;
-        }}
+        }
 
-        .message.user .message-bubble {{
+        .message.user .message-bubble {
             background: linear-gradient(135deg, #eff6ff, #dbeafe);
             border: 1px solid #bfdbfe;
-        }}
+        }
 
-        .message.assistant .message-bubble {{
+        .message.assistant .message-bubble {
             background: linear-gradient(135deg, #f0fdf4, #dcfce7);
             border: 1px solid #bbf7d0;
-        }}
+        }
 
-        .message-bubble::before {{
+        .message-bubble::before {
             content: '';
             position: absolute;
             top: 1rem;
             width: 0;
             height: 0;
             border: 8px solid transparent;
-        }}
+        }
 
-        .message.user .message-bubble::before {{
+        .message.user .message-bubble::before {
             right: -15px;
             border-left-color: #dbeafe;
-        }}
+        }
 
-        .message.assistant .message-bubble::before {{
+        .message.assistant .message-bubble::before {
             left: -15px;
             border-right-color: #dcfce7;
-        }}
+        }
 
-        .message-header {{
+        .message-header {
             display: flex;
             justify-content: space-between;
             align-items: center;
             margin-bottom: 1rem;
             padding-bottom: 0.5rem;
             border-bottom: 1px solid var(--border-color);
-        }}
+        }
 
-        .message-role {{
+        .message-role {
             font-weight: 600;
             text-transform: capitalize;
             font-size: 0.9rem;
-        }}
+        }
 
-        .message.user .message-role {{
+        .message.user .message-role {
             color: #1d4ed8;
-        }}
+        }
 
-        .message.assistant .message-role {{
+        .message.assistant .message-role {
             color: #059669;
-        }}
+        }
 
-        .message-time {{
+        .message-time {
             font-size: 0.8rem;
             color: var(--text-secondary);
-        }}
+        }
 
-        .message-text {{
+        .message-text {
             white-space: pre-wrap;
             word-wrap: break-word;
             line-height: 1.7;
-        }}
+        }
 
-        .code-block {{
+        .code-block {
             background: var(--code-bg);
             border: 1px solid var(--border-color);
             border-radius: 0.5rem;
@@ -530,70 +356,73 @@ class ConversationExporter:
             font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
             font-size: 0.9rem;
             line-height: 1.5;
-        }}
+        }
 
-        .footer {{
+        .footer {
             background: var(--secondary-color);
             padding: 1.5rem 2rem;
             text-align: center;
             font-size: 0.9rem;
             color: var(--text-secondary);
             border-top: 1px solid var(--border-color);
-        }}
+        }
 
-        .footer-links {{
+        .footer-links {
             margin-top: 0.5rem;
-        }}
+        }
 
-        .footer-links a {{
+        .footer-links a {
             color: var(--primary-color);
             text-decoration: none;
             margin: 0 0.5rem;
-        }}
+        }
 
-        .footer-links a:hover {{
+        .footer-links a:hover {
             text-decoration: underline;
-        }}
+        }
 
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(10px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
+        @keyframes fadeIn {
+            from { opacity: 0; transform: translateY(10px); }
+            to { opacity: 1; transform: translateY(0); }
+        }
 
-        @media (max-width: 768px) {{
-            body {{
+        @media (max-width: 768px) {
+            body {
                 padding: 0.5rem;
-            }}
+            }
 
-            .header {{
+            .header {
                 padding: 1.5rem 1rem;
-            }}
+            }
 
-            .header h1 {{
+            .header h1 {
                 font-size: 1.75rem;
-            }}
+            }
 
-            .header-info {{
+            .header-info {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .model-info, .stats, .messages {{
+            .model-info, .stats, .messages {
                 padding: 1.5rem 1rem;
-            }}
+            }
 
-            .info-grid, .stats-grid {{
+            .info-grid, .stats-grid {
                 grid-template-columns: 1fr;
-            }}
+            }
 
-            .message-content {{
+            .message-content {
                 max-width: 85%;
-            }}
+            }
 
-            .message-bubble {{
+            .message-bubble {
                 padding: 1rem;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+# Closes the head and opens the page header
+_HTML_BODY_OPEN_FMT = """    </style>
 </head>
 <body>
     <div class="container">
@@ -603,24 +432,288 @@ class ConversationExporter:
                 <p class="header-subtitle">Conversation Export</p>
                 <div class="header-info">
                     <div class="header-info-item">
-                        <strong>Agent ID:</strong> {self.agent_id}
+                        <strong>Agent ID:</strong> {agent_id}
                     </div>
                     <div class="header-info-item">
-                        <strong>Model:</strong> {self.config.model}
+                        <strong>Model:</strong> {model}
                     </div>
                     <div class="header-info-item">
-                        <strong>Export Date:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+                        <strong>Export Date:</strong> {export_date}
                     </div>
                     <div class="header-info-item">
-                        <strong>Temperature:</strong> {self.config.temperature}
+                        <strong>Temperature:</strong> {temperature}
                     </div>
                 </div>
             </div>
         </div>"""
+
+# Write buffer for export files; large enough that most exports flush in one syscall
+_EXPORT_BUFFER_SIZE = 1 << 17
+
+# Section rules for the plain text export
+_RULE_50 = "=" * 50
+_RULE_20 = "-" * 20 + "\n"
+_RULE_40 = "-" * 40 + "\n"
+
+# Per-role (icon, label) pairs; HTML shows any non-user role as the assistant
+_ROLE_MD = {"user": ("👤", "User"), "assistant": ("🤖", "Assistant")}
+_ROLE_HTML = {"user": ("U", "User"), "assistant": ("AI", "Assistant")}
+
+# Config fields left out of the txt/md configuration sections
+_EXCLUDED_CONFIG_KEYS = frozenset({'created_at', 'updated_at'})
+
+# Export directories already created by this process
+_export_dirs_ready: Set[Path] = set()
+
+# Fenced code detection for HTML message bodies
+_TRIPLE_BACKTICK = '```'
+_CODE_BLOCK_RE = re.compile(r'(```.*?```)', re.DOTALL)
+
+# Heuristics for spotting unfenced code lines in Markdown export
+_CODE_LINE_RE = re.compile(r'\s*(?:(?:def|class|import|from) \s*\S|>|#|//|--)')
+_CODE_KEYWORD_RE = re.compile(r'function|const|let|var')
+_CODE_PUNCT_RE = re.compile(r'[(){}\[\];]')
+
+
+@lru_cache(maxsize=64)
+def _display_key(key: str) -> str:
+    """Turn a config/statistics key into its title-cased label"""
+    return key.replace('_', ' ').title()
+
+
+def _format_duration(duration: timedelta) -> str:
+    """Format a duration like str(timedelta) without the microseconds"""
+    seconds = int(duration.total_seconds())
+    if seconds <= 0:
+        return "0:00:00"
+    days, seconds = divmod(seconds, 86400)
+    hours, seconds = divmod(seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    clock = f"{hours}:{minutes:02d}:{seconds:02d}"
+    if days:
+        return f"{days} day{'s' if days != 1 else ''}, {clock}"
+    return clock
+
+
+def _open_export_file(filepath: Path) -> TextIO:
+    """Open an export file for text output with the large write buffer"""
+    return open(filepath, 'w', encoding='utf-8', buffering=_EXPORT_BUFFER_SIZE)
+
+
+class ConversationExporter:
+    """Handles exporting conversations to various formats"""
+    
+    # Export method for each format in EXPORT_FORMATS
+    _EXPORT_METHODS = {
+        'json': '_export_json',
+        'txt': '_export_txt',
+        'md': '_export_markdown',
+        'html': '_export_html'
+    }
+    
+    def __init__(self, agent_id: str, base_dir: Path, config: Any, messages: List[Message]):
+        self.agent_id = agent_id
+        self.base_dir = base_dir
+        self.config = config
+        self.messages = messages
+        self.export_dir = base_dir / "exports"
+        
+        # Parse each distinct timestamp once and flatten messages into the
+        # (number, role, display time, content) rows every text exporter walks
+        self._ts_cache: Dict[str, Tuple[datetime, str]] = {}
+        self._msg_rows: List[Tuple[int, str, str, str]] = []
+        for i, msg in enumerate(messages, 1):
+            ts = msg.timestamp
+            cached = self._ts_cache.get(ts)
+            if cached is None:
+                parsed = datetime.fromisoformat(ts)
+                cached = self._ts_cache[ts] = (parsed, parsed.strftime("%Y-%m-%d %H:%M:%S"))
+            self._msg_rows.append((i, msg.role, cached[1], msg.content))
+        
+        # Model details don't change during an export; statistics are computed on first use
+        self._model_display = ModelRegistry.get_model_display_name(config.model)
+        self._model_info = ModelRegistry.get_model_info(config.model)
+        self._stats: Optional[Dict[str, Any]] = None
+    
+    def export_conversation(self, format_type: str) -> str:
+        """Export conversation to specified format"""
+        if format_type not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {format_type}. Supported: {list(EXPORT_FORMATS.keys())}")
+        
+        # Create the export directory on first use (once per directory per process)
+        if self.export_dir not in _export_dirs_ready:
+            self.export_dir.mkdir(parents=True, exist_ok=True)
+            _export_dirs_ready.add(self.export_dir)
+        
+        # One clock read per export, shared by the filename and every date in the file
+        now = datetime.now()
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        extension = EXPORT_FORMATS[format_type]['extension']
+        filename = f"conversation_{timestamp}{extension}"
+        filepath = self.export_dir / filename
+        
+        # Route to appropriate export method
+        getattr(self, self._EXPORT_METHODS[format_type])(filepath, now)
+        return str(filepath)
+    
+    def _export_json(self, filepath: Path, now: datetime):
+        """Export conversation as JSON with full metadata"""
+        stats = self._stats_cached()
+        model_display = self._model_display
+        
+        export_data = {
+            "agent_id": self.agent_id,
+            "exported_at": now.isoformat(),
+            "model": {
+                "name": self.config.model,
+                "display_name": model_display,
+                "info": self._model_info
+            },
+            "config": asdict(self.config),
+            "messages": self.messages,
+            "statistics": stats,
+            "export_info": {
+                "format": "json",
+                "version": "1.0",
+                "total_messages": len(self.messages),
+                "file_size_bytes": 0
+            }
+        }
+        
+        # Serialized in one go and written with a single call
+        filepath.write_bytes(_dump_json(export_data))
+    
+    def _export_txt(self, filepath: Path, now: datetime):
+        """Export conversation as plain text"""
+        model_display = self._model_display
+        stats = self._stats_cached()
+        now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # The text export is small enough to assemble in memory and write once
+        buf = []
+        w = buf.append
+        
+        # Header
+        w("OpenAI Unified Agent Conversation Export\n")
+        w(_RULE_50 + "\n\n")
+        w(f"Agent ID: {self.agent_id}\n")
+        w(f"Model: {self.config.model} ({model_display})\n")
+        w(f"Export Date: {now_str}\n")
+        w(f"Total Messages: {stats['total_messages']}\n")
+        w(f"Conversation Duration: {stats['conversation_duration']}\n")
+        w("\n" + _RULE_50 + "\n\n")
+        
+        # Configuration
+        w("CONFIGURATION:\n")
+        w(_RULE_20)
+        for fld in fields(self.config):
+            if fld.name not in _EXCLUDED_CONFIG_KEYS:
+                w(f"{_display_key(fld.name)}: {getattr(self.config, fld.name)}\n")
+        w("\n")
         
-        # Model Information Section
-        if model_info:
-            html_content += f"""
+        # Statistics
+        w("STATISTICS:\n")
+        w(_RULE_20)
+        for key, value in stats.items():
+            if value is not None:
+                w(f"{_display_key(key)}: {value}\n")
+        w("\n" + _RULE_50 + "\n\n")
+        
+        # Messages
+        w("CONVERSATION:\n")
+        w(_RULE_20 + "\n")
+        
+        for i, role, timestamp, content in self._msg_rows:
+            w(f"[{i:03d}] [{timestamp}] {role.upper()}:\n")
+            w(_RULE_40)
+            w(f"{content}\n\n")
+        
+        filepath.write_text(''.join(buf), encoding='utf-8')
+    
+    def _export_markdown(self, filepath: Path, now: datetime):
+        """Export conversation as Markdown"""
+        model_display = self._model_display
+        stats = self._stats_cached()
+        now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+        
+        with _open_export_file(filepath) as f:
+            # Header
+            f.write(f"# 🤖 OpenAI {model_display} Conversation\n\n")
+            f.write(f"**Agent ID:** `{self.agent_id}`  \n")
+            f.write(f"**Model:** `{self.config.model}`  \n")
+            f.write(f"**Export Date:** {now_str}  \n")
+            f.write(f"**Total Messages:** {stats['total_messages']}  \n\n")
+            
+            # Model Information
+            model_info = self._model_info
+            if model_info:
+                f.write("## 📊 Model Information\n\n")
+                f.write(f"- **Name:** {model_info.get('name', 'Unknown')}\n")
+                f.write(f"- **Description:** {model_info.get('description', 'No description')}\n")
+                f.write(f"- **Timeout:** {model_info.get('timeout', 'Unknown')}s\n")
+                f.write(f"- **Max Tokens:** {model_info.get('max_tokens', 'Unknown')}\n")
+                f.write(f"- **Cost Tier:** {model_info.get('cost_tier', 'Unknown').title()}\n\n")
+            
+            # Configuration
+            f.write("## ⚙️ Configuration\n\n")
+            config_values = ((fld.name, getattr(self.config, fld.name)) for fld in fields(self.config))
+            f.write(''.join(
+                f"- **{_display_key(key)}:** `{value}`\n" for key, value in config_values
+                if key not in _EXCLUDED_CONFIG_KEYS and value is not None
+            ))
+            f.write("\n")
+            
+            # Statistics
+            f.write("## 📈 Statistics\n\n")
+            f.write("| Metric | Value |\n")
+            f.write("|--------|-------|\n")
+            f.write(''.join(
+                f"| {_display_key(key)} | {value:,} |\n"
+                if isinstance(value, int) and key != 'conversation_duration'
+                else f"| {_display_key(key)} | {value} |\n"
+                for key, value in stats.items() if value is not None
+            ))
+            f.write("\n")
+            
+            # Conversation
+            f.write("## 💬 Conversation\n\n")
+            
+            fragments = []
+            for i, role, timestamp, content in self._msg_rows:
+                # Role emoji and styling
+                role_emoji, role_display = _ROLE_MD.get(role) or ("ℹ️", role.title())
+                
+                fragments.append(f"### {role_emoji} {role_display} - Message {i}\n")
+                fragments.append(f"*{timestamp}*\n\n")
+                
+                # Format content - handle code blocks properly
+                formatted_content = self._format_markdown_content(content)
+                fragments.append(f"{formatted_content}\n\n")
+                fragments.append("---\n\n")
+            f.writelines(fragments)
+    
+    def _export_html(self, filepath: Path, now: datetime):
+        """Export conversation as HTML with modern styling"""
+        model_display = self._model_display
+        stats = self._stats_cached()
+        model_info = self._model_info
+        now_str = now.strftime('%Y-%m-%d %H:%M:%S')
+        
+        with _open_export_file(filepath) as f:
+            # Modern HTML template; only the small head/header fragments need formatting
+            f.write(_HTML_HEAD_FMT.format(model_display=model_display, agent_id=self.agent_id))
+            f.write(_HTML_CSS)
+            f.write(_HTML_BODY_OPEN_FMT.format(
+                model_display=model_display,
+                agent_id=self.agent_id,
+                model=self.config.model,
+                export_date=now_str,
+                temperature=self.config.temperature
+            ))
+            
+            # Model Information Section
+            if model_info:
+                f.write(f"""
         <div class="model-info">
             <h2>📊 Model Information</h2>
             <div class="info-grid">
@@ -641,10 +734,10 @@ class ConversationExporter:
                     <div class="info-card-value">{model_info.get('cost_tier', 'Unknown').title()}</div>
                 </div>
             </div>
-        </div>"""
-        
-        # Statistics Section
-        html_content += f"""
+        </div>""")
+            
+            # Statistics Section
+            f.write(f"""
         <div class="stats">
             <h2>📈 Conversation Statistics</h2>
             <div class="stats-grid">
@@ -673,26 +766,30 @@ class ConversationExporter:
                     <div class="stat-label">Duration</div>
                 </div>
             </div>
-        </div>"""
-        
-        # Messages Section
-        html_content += """
-        <div class="messages">
-            <h2>💬 Conversation</h2>"""
-        
-        for i, msg in enumerate(self.messages, 1):
-            timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
-            role = msg["role"]
-            content = msg["content"]
-            
-            # Escape HTML and format content
-            content_escaped = html.escape(content)
-            content_formatted = self._format_html_content(content_escaped)
+        </div>""")
             
-            avatar_text = "U" if role == "user" else "AI"
-            role_display = "User" if role == "user" else "Assistant"
+            # Messages Section
+            f.write("""
+        <div class="messages">
+            <h2>💬 Conversation</h2>""")
             
-            html_content += f"""
+            # The per-message f-string is compiled once with the module, so the
+            # loop only binds its hot lookups to locals
+            fragments = []
+            append = fragments.append
+            escape = html.escape
+            default_role = _ROLE_HTML["assistant"]
+            for _, role, timestamp, content in self._msg_rows:
+                # Escape HTML and format content; plain messages skip the code block splitter
+                content_escaped = escape(content)
+                if _TRIPLE_BACKTICK in content_escaped:
+                    content_formatted = self._format_html_code_blocks(content_escaped)
+                else:
+                    content_formatted = content_escaped.replace('\n', '<br>')
+                
+                avatar_text, role_display = _ROLE_HTML.get(role, default_role)
+                
+                append(f"""
             <div class="message {role}">
                 <div class="message-avatar">{avatar_text}</div>
                 <div class="message-content">
@@ -704,14 +801,15 @@ class ConversationExporter:
                         <div class="message-text">{content_formatted}</div>
                     </div>
                 </div>
-            </div>"""
-        
-        # Footer
-        html_content += f"""
+            </div>""")
+            f.writelines(fragments)
+            
+            # Footer
+            f.write(f"""
         </div>
         
         <div class="footer">
-            <p>Generated by OpenAI Unified Agent • Agent ID: {self.agent_id} • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Generated by OpenAI Unified Agent • Agent ID: {self.agent_id} • {now_str}</p>
             <div class="footer-links">
                 <span>Model: {model_display}</span>
                 <span>•</span>
@@ -722,10 +820,13 @@ class ConversationExporter:
         </div>
     </div>
 </body>
-</html>"""
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+</html>""")
+    
+    def _stats_cached(self) -> Dict[str, Any]:
+        """Get conversation statistics, calculating them only once"""
+        if self._stats is None:
+            self._stats = self._calculate_statistics()
+        return self._stats
     
     def _calculate_statistics(self) -> Dict[str, Any]:
         """Calculate conversation statistics"""
@@ -741,25 +842,30 @@ class ConversationExporter:
                 "conversation_duration": None
             }
         
-        user_msgs = [m for m in self.messages if m["role"] == "user"]
-        assistant_msgs = [m for m in self.messages if m["role"] == "assistant"]
-        
-        total_chars = sum(len(m["content"]) for m in self.messages)
-        avg_length = total_chars // len(self.messages) if self.messages else 0
+        # Single pass over the messages for counts and character totals
+        user_count = assistant_count = total_chars = 0
+        for m in self.messages:
+            role = m.role
+            total_chars += len(m.content)
+            if role == "user":
+                user_count += 1
+            elif role == "assistant":
+                assistant_count += 1
+        avg_length = total_chars // len(self.messages)
         
-        first_time = datetime.fromisoformat(self.messages[0]["timestamp"])
-        last_time = datetime.fromisoformat(self.messages[-1]["timestamp"])
-        duration = last_time - first_time
+        first_time, first_display = self._ts_cache[self.messages[0].timestamp]
+        last_time, last_display = self._ts_cache[self.messages[-1].timestamp]
+        duration = _format_duration(last_time - first_time) if len(self.messages) > 1 else "0:00:00"
         
         return {
             "total_messages": len(self.messages),
-            "user_messages": len(user_msgs),
-            "assistant_messages": len(assistant_msgs),
+            "user_messages": user_count,
+            "assistant_messages": assistant_count,
             "total_characters": total_chars,
             "average_message_length": avg_length,
-            "first_message": first_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "last_message": last_time.strftime("%Y-%m-%d %H:%M:%S"),
-            "conversation_duration": str(duration).split('.')[0] if duration.total_seconds() > 0 else "0:00:00"
+            "first_message": first_display,
+            "last_message": last_display,
+            "conversation_duration": duration
         }
     
     def _format_markdown_content(self, content: str) -> str:
@@ -775,14 +881,14 @@ class ConversationExporter:
         
         for line in lines:
             # Detect potential code lines
-            if (line.strip().startswith(('def ', 'class ', 'import ', 'from ', '>', '#', '//', '--')) or
-                '=' in line and any(keyword in line for keyword in ['function', 'const', 'let', 'var'])):
+            if (_CODE_LINE_RE.match(line) or
+                '=' in line and _CODE_KEYWORD_RE.search(line)):
                 if not in_code_block:
                     formatted_lines.append('```')
                     in_code_block = True
             elif in_code_block and line.strip() == '':
                 pass  # Keep empty lines in code blocks
-            elif in_code_block and not any(char in line for char in '(){}[];'):
+            elif in_code_block and not _CODE_PUNCT_RE.search(line):
                 formatted_lines.append('```')
                 in_code_block = False
             
@@ -796,27 +902,31 @@ class ConversationExporter:
     def _format_html_content(self, content: str) -> str:
         """Format content for HTML export with code block handling"""
         # Handle code blocks marked with ```
-        if '```' in content:
-            parts = re.split(r'(```.*?```)', content, flags=re.DOTALL)
-            formatted_parts = []
-            
-            for part in parts:
-                if part.startswith('```') and part.endswith('```'):
-                    # This is a code block
-                    code_content = part[3:-3].strip()
-                    formatted_parts.append(f'<div class="code-block">{code_content}</div>')
-                else:
-                    # Regular text - convert newlines to <br>
-                    formatted_parts.append(part.replace('\n', '<br>'))
-            
-            return ''.join(formatted_parts)
+        if _TRIPLE_BACKTICK in content:
+            return self._format_html_code_blocks(content)
         else:
             # No code blocks, just convert newlines
             return content.replace('\n', '<br>')
+    
+    def _format_html_code_blocks(self, content: str) -> str:
+        """Format content already known to contain ``` fences"""
+        parts = _CODE_BLOCK_RE.split(content)
+        formatted_parts = []
+        
+        for part in parts:
+            if part.startswith(_TRIPLE_BACKTICK) and part.endswith(_TRIPLE_BACKTICK):
+                # This is a code block
+                code_content = part[3:-3].strip()
+                formatted_parts.append(f'<div class="code-block">{code_content}</div>')
+            else:
+                # Regular text - convert newlines to <br>
+                formatted_parts.append(part.replace('\n', '<br>'))
+        
+        return ''.join(formatted_parts)
 
 
 def export_conversation(agent_id: str, base_dir: Path, config: Any, 
-                       messages: List[Dict[str, Any]], format_type: str) -> str:
+                       messages: List[Message], format_type: str) -> str:
     """
     Convenience function to export a conversation
     
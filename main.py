@@ -9,25 +9,41 @@ all supported OpenAI models through a unified, professional system.
 import sys
 import argparse
 from pathlib import Path
-from datetime import datetime
-from dataclasses import asdict
-from typing import Optional, Dict, Any
+from dataclasses import fields
+from typing import Optional, Dict, Any, Callable, List
 
-from config import ModelRegistry, AgentConfig
+from config import ModelRegistry, AgentConfig, EXPORT_FORMATS
 from agent import UnifiedOpenAIAgent, list_agents, show_agent_info
-from export import export_conversation, get_supported_formats, validate_export_format
-from utils import ColorUtils, ValidationUtils
+from utils import ColorUtils, ValidationUtils, format_clock_time, format_short_datetime
 
+# Use prompt_toolkit for line editing and persistent input history when available
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.formatted_text import ANSI
+    from prompt_toolkit.history import FileHistory
+    HAS_PROMPT_TOOLKIT = True
+except ImportError:
+    HAS_PROMPT_TOOLKIT = False
 
-class EnhancedCLI:
-    """Enhanced CLI interface with legendary user experience"""
-    
-    def __init__(self):
-        self.current_agent: Optional[UnifiedOpenAIAgent] = None
-    
-    def display_welcome(self):
-        """Display welcome banner"""
-        banner = f"""
+# Chat input history shared by all agents
+CHAT_HISTORY_FILE = Path.home() / ".openai_agent_history"
+
+
+# Prompts asked by configure_agent_interactive, in order:
+# (config field, prompt label, parser, validator, name used in error messages)
+_CONFIG_PROMPTS = [
+    ('temperature', 'Temperature (0.0-2.0)', float, ValidationUtils.validate_temperature, 'temperature'),
+    ('system_prompt', 'System prompt', None, None, None),
+    ('max_tokens', 'Max tokens', int, ValidationUtils.validate_max_tokens, 'max tokens'),
+    ('stream', 'Enable streaming (y/n)', None, None, None),
+]
+
+# Agent listing columns and their minimum widths
+_AGENT_COLUMN_HEADERS = ('ID', 'Model', 'Messages', 'Last Updated')
+_AGENT_COLUMN_WIDTHS = (20, 25, 10, 20)
+
+# Static CLI text, colored once at import
+_WELCOME_BANNER = f"""
 {ColorUtils.info('╔══════════════════════════════════════════════════════════════╗')}
 {ColorUtils.info('║')}            {ColorUtils.success('🤖 OpenAI Unified Agent System')}                 {ColorUtils.info('║')}
 {ColorUtils.info('║')}               {ColorUtils.warning('Professional AI Chat Interface')}             {ColorUtils.info('║')}
@@ -44,7 +60,41 @@ class EnhancedCLI:
 {ColorUtils.info('║')}   • Advanced configuration management                           {ColorUtils.info('║')}
 {ColorUtils.info('╚══════════════════════════════════════════════════════════════╝')}
         """
-        print(banner)
+
+_CHAT_HELP = f"""
+{ColorUtils.success('📚 Available Commands:')}
+{'-' * 40}
+{ColorUtils.info('help, h')}              - Show this help message
+{ColorUtils.info('history [n]')}          - Show last n messages (default: 5)
+{ColorUtils.info('search <term>')}        - Search conversation history
+{ColorUtils.info('stats')}                - Show conversation statistics
+{ColorUtils.info('config')}               - Show current configuration
+{ColorUtils.info('export <format>')}      - Export conversation (json/txt/md/html)
+{ColorUtils.info('clear')}                - Clear conversation history
+{ColorUtils.info('files')}                - List available files for inclusion
+{ColorUtils.info('info')}                 - Show agent information
+{ColorUtils.info('model')}                - Show current model information
+{ColorUtils.info('switch <model>')}       - Switch to different model
+{ColorUtils.info('quit, exit, q')}        - Exit chat
+
+{ColorUtils.success('📁 File Inclusion:')}
+Use {{filename}} in your messages to include file contents.
+Supported: Programming files, config files, documentation, etc.
+
+{ColorUtils.success('🎨 Models Available:')}"""
+
+
+class EnhancedCLI:
+    """Enhanced CLI interface with legendary user experience"""
+    
+    def __init__(self):
+        self.current_agent: Optional[UnifiedOpenAIAgent] = None
+        self._command_table = self._build_command_table()
+        self._prompt_session = None  # created on first chat prompt
+    
+    def display_welcome(self):
+        """Display welcome banner"""
+        print(_WELCOME_BANNER)
     
     def display_models_info(self):
         """Display detailed information about available models"""
@@ -79,8 +129,7 @@ class EnhancedCLI:
         # Select model
         print(f"\n{ColorUtils.success('Available Models:')}")
         models = ModelRegistry.list_models()
-        for i, model in enumerate(models, 1):
-            model_info = ModelRegistry.get_model_info(model)
+        for i, (model, model_info) in enumerate(ModelRegistry.SUPPORTED_MODELS.items(), 1):
             print(f"  {i}. {ColorUtils.warning(model_info['name'])} ({model}) - {model_info['description']}")
         
         while True:
@@ -120,51 +169,43 @@ class EnhancedCLI:
         
         config_updates = {}
         
-        # Temperature
-        current_temp = agent.config.temperature
-        temp_input = input(f"Temperature (0.0-2.0) [{current_temp}]: ").strip()
-        if temp_input:
-            try:
-                temp_value = float(temp_input)
-                if ValidationUtils.validate_temperature(temp_value):
-                    config_updates['temperature'] = temp_value
-                else:
-                    print(ColorUtils.error("Invalid temperature value"))
-            except ValueError:
-                print(ColorUtils.error("Invalid temperature format"))
-        
-        # System prompt
-        current_prompt = agent.config.system_prompt or "None"
-        print(f"Current system prompt: {ColorUtils.warning(current_prompt[:50] + '...' if len(current_prompt) > 50 else current_prompt)}")
-        system_prompt = input("System prompt (press Enter to keep current): ").strip()
-        if system_prompt:
-            config_updates['system_prompt'] = system_prompt
-        
-        # Max tokens
-        current_tokens = agent.config.max_tokens
-        tokens_input = input(f"Max tokens [{current_tokens}]: ").strip()
-        if tokens_input:
+        for name, label, parse, validate, error_label in _CONFIG_PROMPTS:
+            current = getattr(agent.config, name)
+            
+            if name == 'system_prompt':
+                current_prompt = current or "None"
+                print(f"Current system prompt: {ColorUtils.warning(current_prompt[:50] + '...' if len(current_prompt) > 50 else current_prompt)}")
+                system_prompt = input(f"{label} (press Enter to keep current): ").strip()
+                if system_prompt:
+                    config_updates[name] = system_prompt
+                continue
+            
+            if name == 'stream':
+                stream_input = input(f"{label} [{'y' if current else 'n'}]: ").strip().lower()
+                if stream_input in ['y', 'yes', 'true']:
+                    config_updates[name] = True
+                elif stream_input in ['n', 'no', 'false']:
+                    config_updates[name] = False
+                continue
+            
+            raw = input(f"{label} [{current}]: ").strip()
+            if not raw:
+                continue
             try:
-                tokens_value = int(tokens_input)
-                if ValidationUtils.validate_max_tokens(tokens_value):
-                    config_updates['max_tokens'] = tokens_value
-                else:
-                    print(ColorUtils.error("Invalid max tokens value"))
+                value = parse(raw)
             except ValueError:
-                print(ColorUtils.error("Invalid max tokens format"))
-        
-        # Streaming
-        current_stream = agent.config.stream
-        stream_input = input(f"Enable streaming (y/n) [{'y' if current_stream else 'n'}]: ").strip().lower()
-        if stream_input in ['y', 'yes', 'true']:
-            config_updates['stream'] = True
-        elif stream_input in ['n', 'no', 'false']:
-            config_updates['stream'] = False
+                print(ColorUtils.error(f"Invalid {error_label} format"))
+                continue
+            if validate(value):
+                config_updates[name] = value
+            else:
+                print(ColorUtils.error(f"Invalid {error_label} value"))
         
         # Apply updates
         if config_updates:
             try:
                 agent.update_config(**config_updates)
+                agent.flush_config()
                 print(ColorUtils.success("✅ Configuration updated successfully!"))
             except Exception as e:
                 print(ColorUtils.error(f"Configuration update failed: {e}"))
@@ -188,7 +229,7 @@ class EnhancedCLI:
         
         while True:
             try:
-                user_input = input(f"\n{ColorUtils.info('You:')} ").strip()
+                user_input = self._read_chat_input(f"\n{ColorUtils.info('You:')} ").strip()
                 
                 if not user_input:
                     continue
@@ -207,11 +248,11 @@ class EnhancedCLI:
                 # Regular message - send to API
                 print(f"\n{ColorUtils.success('Assistant:')} ", end="", flush=True)
                 
-                response_text = ""
                 try:
+                    # Chunks are already grouped per network read, so each one
+                    # is flushed straight away and text never stalls mid-line
                     for chunk in agent.call_api(user_input):
                         print(chunk, end="", flush=True)
-                        response_text += chunk
                     print()  # New line after response
                     
                 except KeyboardInterrupt:
@@ -224,107 +265,98 @@ class EnhancedCLI:
             except Exception as e:
                 print(f"\n{ColorUtils.error(f'Unexpected error: {e}')}")
     
+    def _read_chat_input(self, prompt: str) -> str:
+        """Read a chat line, with editing and history when prompt_toolkit is available"""
+        if not HAS_PROMPT_TOOLKIT or not sys.stdin.isatty():
+            return input(prompt)
+        
+        if self._prompt_session is None:
+            self._prompt_session = PromptSession(history=FileHistory(str(CHAT_HISTORY_FILE)))
+        return self._prompt_session.prompt(ANSI(prompt))
+    
     def handle_chat_command(self, command: str, agent: UnifiedOpenAIAgent) -> bool:
         """Handle chat commands. Returns True if should exit chat."""
         parts = command.split()
         cmd = parts[0].lower()
         
-        if cmd in ['help', 'h']:
-            self.show_chat_help()
-        
-        elif cmd in ['quit', 'exit', 'q']:
-            print(ColorUtils.success("👋 Goodbye!"))
-            return True
-        
-        elif cmd in ['history', 'hist']:
-            limit = 5
-            if len(parts) > 1:
-                try:
-                    limit = int(parts[1])
-                except ValueError:
-                    print(ColorUtils.error("Invalid number for history limit"))
-                    return False
-            
-            self.show_history(agent, limit)
-        
-        elif cmd == 'search':
-            if len(parts) < 2:
-                print(ColorUtils.error("Usage: search <term>"))
-                return False
-            
-            search_term = ' '.join(parts[1:])
-            self.search_history(agent, search_term)
-        
-        elif cmd in ['stats', 'statistics']:
-            self.show_statistics(agent)
-        
-        elif cmd in ['config', 'configuration']:
-            self.show_configuration(agent)
-        
-        elif cmd == 'export':
-            if len(parts) < 2:
-                print(ColorUtils.error(f"Usage: export <{'/'.join(get_supported_formats().keys())}>"))
-                return False
-            
-            format_type = parts[1].lower()
-            self.export_conversation(agent, format_type)
-        
-        elif cmd == 'clear':
-            self.clear_history(agent)
-        
-        elif cmd in ['files', 'file']:
-            self.list_files(agent)
+        handler = self._command_table.get(cmd)
+        if handler is None:
+            print(ColorUtils.error(f"Unknown command: {cmd}"))
+            print(ColorUtils.info("Type 'help' for available commands"))
+            return False
         
-        elif cmd in ['info', 'agent-info']:
-            show_agent_info(agent.agent_id)
+        return bool(handler(agent, parts))
+    
+    def _build_command_table(self) -> Dict[str, Callable[[UnifiedOpenAIAgent, List[str]], Optional[bool]]]:
+        """Map every chat command alias to its handler"""
+        handlers = {
+            ('help', 'h'): lambda agent, parts: self.show_chat_help(),
+            ('quit', 'exit', 'q'): self._cmd_quit,
+            ('history', 'hist'): self._cmd_history,
+            ('search',): self._cmd_search,
+            ('stats', 'statistics'): lambda agent, parts: self.show_statistics(agent),
+            ('config', 'configuration'): lambda agent, parts: self.show_configuration(agent),
+            ('export',): self._cmd_export,
+            ('clear',): lambda agent, parts: self.clear_history(agent),
+            ('files', 'file'): lambda agent, parts: self.list_files(agent),
+            ('info', 'agent-info'): lambda agent, parts: show_agent_info(agent.agent_id),
+            ('model',): lambda agent, parts: self.show_model_info(agent),
+            ('switch',): self._cmd_switch,
+        }
+        return {alias: handler for aliases, handler in handlers.items() for alias in aliases}
+    
+    def _cmd_quit(self, agent: UnifiedOpenAIAgent, parts: List[str]) -> bool:
+        """Leave the chat session"""
+        print(ColorUtils.success("👋 Goodbye!"))
+        return True
+    
+    def _cmd_history(self, agent: UnifiedOpenAIAgent, parts: List[str]):
+        """Show the last n messages (default 5)"""
+        limit = 5
+        if len(parts) > 1:
+            try:
+                limit = int(parts[1])
+            except ValueError:
+                print(ColorUtils.error("Invalid number for history limit"))
+                return
         
-        elif cmd == 'model':
-            self.show_model_info(agent)
+        self.show_history(agent, limit)
+    
+    def _cmd_search(self, agent: UnifiedOpenAIAgent, parts: List[str]):
+        """Search the conversation history"""
+        if len(parts) < 2:
+            print(ColorUtils.error("Usage: search <term>"))
+            return
         
-        elif cmd == 'switch':
-            if len(parts) < 2:
-                print(ColorUtils.error("Usage: switch <model>"))
-                self.display_models_info()
-                return False
-            
-            new_model = parts[1]
-            self.switch_model(agent, new_model)
+        search_term = ' '.join(parts[1:])
+        self.search_history(agent, search_term)
+    
+    def _cmd_export(self, agent: UnifiedOpenAIAgent, parts: List[str]):
+        """Export the conversation in the requested format"""
+        if len(parts) < 2:
+            print(ColorUtils.error(f"Usage: export <{'/'.join(EXPORT_FORMATS.keys())}>"))
+            return
         
-        else:
-            print(ColorUtils.error(f"Unknown command: {cmd}"))
-            print(ColorUtils.info("Type 'help' for available commands"))
+        format_type = parts[1].lower()
+        self.export_conversation(agent, format_type)
+    
+    def _cmd_switch(self, agent: UnifiedOpenAIAgent, parts: List[str]):
+        """Switch the agent to another model"""
+        if len(parts) < 2:
+            print(ColorUtils.error("Usage: switch <model>"))
+            self.display_models_info()
+            return
         
-        return False
+        new_model = parts[1]
+        self.switch_model(agent, new_model)
     
     def show_chat_help(self):
         """Display chat help information"""
-        help_text = f"""
-{ColorUtils.success('📚 Available Commands:')}
-{'-' * 40}
-{ColorUtils.info('help, h')}              - Show this help message
-{ColorUtils.info('history [n]')}          - Show last n messages (default: 5)
-{ColorUtils.info('search <term>')}        - Search conversation history
-{ColorUtils.info('stats')}                - Show conversation statistics
-{ColorUtils.info('config')}               - Show current configuration
-{ColorUtils.info('export <format>')}      - Export conversation (json/txt/md/html)
-{ColorUtils.info('clear')}                - Clear conversation history
-{ColorUtils.info('files')}                - List available files for inclusion
-{ColorUtils.info('info')}                 - Show agent information
-{ColorUtils.info('model')}                - Show current model information
-{ColorUtils.info('switch <model>')}       - Switch to different model
-{ColorUtils.info('quit, exit, q')}        - Exit chat
-
-{ColorUtils.success('📁 File Inclusion:')}
-Use {{filename}} in your messages to include file contents.
-Supported: Programming files, config files, documentation, etc.
-
-{ColorUtils.success('🎨 Models Available:')}"""
-        
-        for model in ModelRegistry.list_models():
-            model_info = ModelRegistry.get_model_info(model)
-            help_text += f"\n{ColorUtils.warning(model)} - {model_info['description']}"
-        
-        print(help_text)
+        models_text = "".join(
+            f"\n{ColorUtils.warning(model)} - {model_info['description']}"
+            for model, model_info in ModelRegistry.SUPPORTED_MODELS.items()
+        )
+        print(_CHAT_HELP + models_text)
     
     def show_history(self, agent: UnifiedOpenAIAgent, limit: int):
         """Show conversation history"""
@@ -336,14 +368,17 @@ Supported: Programming files, config files, documentation, etc.
         print(f"\n{ColorUtils.success(f'📜 Last {len(recent_messages)} messages:')}")
         print("-" * 50)
         
+        warning_on, info_on, success_on, off = (
+            ColorUtils.WARNING_ON, ColorUtils.INFO_ON, ColorUtils.SUCCESS_ON, ColorUtils.OFF
+        )
         for i, msg in enumerate(recent_messages, 1):
-            timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%H:%M:%S")
-            role = msg["role"]
-            content = msg["content"]
+            timestamp = format_clock_time(msg.timestamp)
+            role = msg.role
+            content = msg.content
             preview = content[:100] + "..." if len(content) > 100 else content
             
-            role_color = ColorUtils.info if role == "user" else ColorUtils.success
-            print(f"{ColorUtils.warning(f'[{timestamp}]')} {role_color(role.title())}: {preview}")
+            role_on = info_on if role == "user" else success_on
+            print(f"{warning_on}[{timestamp}]{off} {role_on}{role.title()}{off}: {preview}")
     
     def search_history(self, agent: UnifiedOpenAIAgent, term: str):
         """Search conversation history"""
@@ -356,14 +391,17 @@ Supported: Programming files, config files, documentation, etc.
         print(f"\n{ColorUtils.success(f'🔍 Found {len(results)} matches for \"{term}\":')}")
         print("-" * 50)
         
+        warning_on, info_on, success_on, off = (
+            ColorUtils.WARNING_ON, ColorUtils.INFO_ON, ColorUtils.SUCCESS_ON, ColorUtils.OFF
+        )
         for result in results:
             msg = result["message"]
-            timestamp = datetime.fromisoformat(msg["timestamp"]).strftime("%H:%M:%S")
-            role = msg["role"]
+            timestamp = format_clock_time(msg.timestamp)
+            role = msg.role
             preview = result["preview"]
             
-            role_color = ColorUtils.info if role == "user" else ColorUtils.success
-            print(f"{ColorUtils.warning(f'[{timestamp}]')} {role_color(role.title())}: {preview}")
+            role_on = info_on if role == "user" else success_on
+            print(f"{warning_on}[{timestamp}]{off} {role_on}{role.title()}{off}: {preview}")
     
     def show_statistics(self, agent: UnifiedOpenAIAgent):
         """Show conversation statistics"""
@@ -389,8 +427,8 @@ Supported: Programming files, config files, documentation, etc.
         print(f"\n{ColorUtils.success('⚙️ Agent Configuration:')}")
         print("-" * 30)
         
-        config_dict = asdict(agent.config)
-        for key, value in config_dict.items():
+        for fld in fields(agent.config):
+            key, value = fld.name, getattr(agent.config, fld.name)
             if key not in ['created_at', 'updated_at'] and value is not None:
                 display_key = key.replace('_', ' ').title()
                 
@@ -405,8 +443,11 @@ Supported: Programming files, config files, documentation, etc.
     
     def export_conversation(self, agent: UnifiedOpenAIAgent, format_type: str):
         """Export conversation"""
+        # The exporter (and its HTML templates) is only loaded when actually exporting
+        from export import export_conversation, validate_export_format
+        
         if not validate_export_format(format_type):
-            formats = list(get_supported_formats().keys())
+            formats = list(EXPORT_FORMATS.keys())
             print(ColorUtils.error(f"Invalid format. Supported formats: {', '.join(formats)}"))
             return
         
@@ -469,8 +510,7 @@ Supported: Programming files, config files, documentation, etc.
         if not ModelRegistry.is_valid_model(new_model):
             print(ColorUtils.error(f"Invalid model: {new_model}"))
             print(f"\n{ColorUtils.info('Available models:')}")
-            for model in ModelRegistry.list_models():
-                model_info = ModelRegistry.get_model_info(model)
+            for model, model_info in ModelRegistry.SUPPORTED_MODELS.items():
                 print(f"  • {ColorUtils.warning(model)} - {model_info['name']}")
             return
         
@@ -493,24 +533,27 @@ Supported: Programming files, config files, documentation, etc.
             print(ColorUtils.warning("No agents found"))
             return
         
-        print(f"\n{ColorUtils.success('🤖 Available Agents:')}")
-        print("-" * 90)
-        print(f"{'ID':<20} {'Model':<25} {'Messages':<10} {'Last Updated':<20}")
-        print("-" * 90)
-        
+        rows = []
         for agent_info in agents:
             updated = agent_info.get("updated_at", "Unknown")
             if updated != "Unknown":
-                try:
-                    updated = datetime.fromisoformat(updated).strftime("%Y-%m-%d %H:%M")
-                except:
-                    pass
-            
-            model = agent_info.get('model', 'gpt-4.1')
-            model_display = ModelRegistry.get_model_display_name(model)
-            message_count = agent_info.get('message_count', 0)
+                updated = format_short_datetime(updated)
             
-            print(f"{agent_info['id']:<20} {model_display:<25} {message_count:<10} {updated:<20}")
+            model_display = ModelRegistry.get_model_display_name(agent_info.get('model', 'gpt-4.1'))
+            rows.append((str(agent_info['id']), model_display, str(agent_info.get('message_count', 0)), str(updated)))
+        
+        # Columns keep their usual widths but grow to fit longer values
+        widths = [max(min_width, *(len(row[col]) for row in rows)) for col, min_width in enumerate(_AGENT_COLUMN_WIDTHS)]
+        rule = "-" * max(90, sum(widths) + len(widths) - 1)
+        
+        lines = [
+            f"\n{ColorUtils.success('🤖 Available Agents:')}",
+            rule,
+            " ".join(header.ljust(width) for header, width in zip(_AGENT_COLUMN_HEADERS, widths)),
+            rule,
+        ]
+        lines.extend(" ".join(cell.ljust(width) for cell, width in zip(row, widths)) for row in rows)
+        sys.stdout.write("\n".join(lines) + "\n")
     
     def run(self):
         """Main CLI entry point"""
@@ -537,7 +580,7 @@ Examples:
         parser.add_argument("--config", action="store_true", help="Configure agent interactively")
         parser.add_argument("--temperature", type=float, help="Override temperature (0.0-2.0)")
         parser.add_argument("--no-stream", action="store_true", help="Disable streaming")
-        parser.add_argument("--export", choices=list(get_supported_formats().keys()), 
+        parser.add_argument("--export", choices=list(EXPORT_FORMATS.keys()), 
                           help="Export conversation format")
         parser.add_argument("--models", action="store_true", help="Show available models")
         parser.add_argument("--create", action="store_true", help="Create a new agent interactively")
@@ -617,6 +660,7 @@ Examples:
             if config_updates:
                 try:
                     agent.update_config(**config_updates)
+                    agent.flush_config()
                     print(ColorUtils.success("✅ Configuration updated"))
                 except Exception as e:
                     print(ColorUtils.error(f"Configuration update failed: {e}"))
@@ -630,6 +674,9 @@ Examples:
         except Exception as e:
             print(ColorUtils.error(f"Unexpected error: {e}"))
             sys.exit(1)
+        finally:
+            if self.current_agent:
+                self.current_agent.close()
 
 
 def main():
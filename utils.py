@@ -11,13 +11,22 @@ import sys
 import json
 import re
 import logging
+import queue
+import atexit
+import heapq
+import mmap
 import shutil
+import stat
+import string
 import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Generator
+from typing import Optional, Dict, Any, List, Set, Generator, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, HTTPError, Timeout
 
 from config import ModelRegistry, CLI_COLORS, DEFAULT_SEARCH_PATHS
@@ -37,49 +46,146 @@ except ImportError:
     
     HAS_COLORAMA = False
 
+# Use orjson for parsing streamed response chunks when available
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+# Seconds to wait before each retry of a failed API request
+_RETRY_DELAYS = (1, 2, 4)
+
+# Bytes requested per read when scanning a streamed response for lines
+_STREAM_READ_SIZE = 1 << 16
+
+
+def _pop_lines(buf: bytearray) -> List[bytes]:
+    """Remove and return the complete lines at the front of buf"""
+    end = buf.rfind(b"\n")
+    if end == -1:
+        return []
+    lines = bytes(buf[:end]).split(b"\n")
+    del buf[:end + 1]
+    return lines
+
+
+def _iter_stream_batches(response: requests.Response) -> Generator[List[bytes], None, None]:
+    """Yield the complete raw lines of each network read of a streamed response,
+    splitting in C instead of per line in Python"""
+    read1 = getattr(response.raw, 'read1', None)
+    if read1 is not None:
+        # urllib3 2.x: return whatever has arrived, without waiting to fill the buffer
+        chunks = iter(lambda: read1(_STREAM_READ_SIZE, decode_content=True), b"")
+    else:
+        chunks = response.iter_content(chunk_size=None)
+    
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        yield _pop_lines(buf)
+    if buf:
+        yield [bytes(buf)]
+
+
+# Linux ioctl that clones a file's extents copy-on-write (Btrfs, XFS, ...)
+_FICLONE = 0x40049409
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# File inclusion syntax: {filename}
+_INCLUDE_RE = re.compile(r'\{([^}]+)\}')
+
+# Included files at least this large are decoded from an mmap instead of read()
+_MMAP_MIN_SIZE = 1 << 16
+
+
+def _decode_text(raw) -> str:
+    """Decode file bytes (or any buffer) as UTF-8, falling back to latin-1"""
+    try:
+        return str(raw, 'utf-8')
+    except UnicodeDecodeError:
+        return str(raw, 'latin-1')
+
+
+# Comment-style header placed before included file contents, by lowercased suffix
+_HEADER_TEMPLATES = {
+    '.py': "# File: {filename} ({suffix})\n",
+    '.r': "# File: {filename} ({suffix})\n",
+    '.html': "<!-- File: {filename} ({suffix}) -->\n",
+    '.xml': "<!-- File: {filename} ({suffix}) -->\n",
+    '.css': "/* File: {filename} ({suffix}) */\n",
+    '.scss': "/* File: {filename} ({suffix}) */\n",
+    '.sass': "/* File: {filename} ({suffix}) */\n",
+    '.sql': "-- File: {filename} ({suffix})\n",
+}
+_DEFAULT_HEADER_TEMPLATE = "// File: {filename} ({suffix})\n"
+
+# Agent IDs: ASCII alphanumeric, hyphens and underscores only
+_AGENT_ID_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+
+
+# Escape codes resolved once at import (empty strings when colorama is missing)
+_COLOR_MAP = {
+    'red': Fore.RED,
+    'green': Fore.GREEN,
+    'yellow': Fore.YELLOW,
+    'blue': Fore.BLUE,
+    'cyan': Fore.CYAN,
+    'white': Fore.WHITE,
+    'magenta': Fore.MAGENTA,
+    'reset': Style.RESET_ALL
+}
+_GREEN, _RED, _YELLOW, _CYAN = Fore.GREEN, Fore.RED, Fore.YELLOW, Fore.CYAN
+_RESET = Style.RESET_ALL
+
 
 class ColorUtils:
     """Utility class for handling colored terminal output"""
     
+    # Raw escape codes for hot loops that inline them instead of calling the helpers
+    SUCCESS_ON = _GREEN
+    ERROR_ON = _RED
+    WARNING_ON = _YELLOW
+    INFO_ON = _CYAN
+    OFF = _RESET
+    
     @staticmethod
     def colorize(text: str, color: str) -> str:
         """Apply color to text if colorama is available"""
         if not HAS_COLORAMA:
             return text
         
-        color_map = {
-            'red': Fore.RED,
-            'green': Fore.GREEN,
-            'yellow': Fore.YELLOW,
-            'blue': Fore.BLUE,
-            'cyan': Fore.CYAN,
-            'white': Fore.WHITE,
-            'magenta': Fore.MAGENTA,
-            'reset': Style.RESET_ALL
-        }
-        
-        color_code = color_map.get(color.lower(), '')
-        return f"{color_code}{text}{Style.RESET_ALL}" if color_code else text
+        # Callers pass lowercase names; only fall back to lower() for others
+        color_code = _COLOR_MAP.get(color) or _COLOR_MAP.get(color.lower(), '')
+        return f"{color_code}{text}{_RESET}" if color_code else text
     
     @staticmethod
     def success(text: str) -> str:
         """Apply success color (green)"""
-        return ColorUtils.colorize(text, 'green')
+        return f"{_GREEN}{text}{_RESET}"
     
     @staticmethod
     def error(text: str) -> str:
         """Apply error color (red)"""
-        return ColorUtils.colorize(text, 'red')
+        return f"{_RED}{text}{_RESET}"
     
     @staticmethod
     def warning(text: str) -> str:
         """Apply warning color (yellow)"""
-        return ColorUtils.colorize(text, 'yellow')
+        return f"{_YELLOW}{text}{_RESET}"
     
     @staticmethod
     def info(text: str) -> str:
         """Apply info color (cyan)"""
-        return ColorUtils.colorize(text, 'cyan')
+        return f"{_CYAN}{text}{_RESET}"
+    
+    if not HAS_COLORAMA:
+        # No escape codes to add: str() returns str input unchanged,
+        # skipping the f-string build on every call
+        success = error = warning = info = staticmethod(str)
 
 
 class DirectoryManager:
@@ -103,6 +209,112 @@ class DirectoryManager:
         return base_dir
 
 
+class _BatchedAppendHandler(logging.Handler):
+    """Append-only log file handler that coalesces queued records into one write.
+
+    Runs on the shared log writer thread: records are buffered until
+    _LogRouter sees the queue drain (or a batch fills up) and written
+    together, with a single writev() where the platform has it. O_APPEND
+    keeps each write atomic with respect to other writers of the same file.
+    """
+    
+    _MAX_BATCH = 64
+    
+    def __init__(self, filename: Path, encoding: str = 'utf-8'):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.encoding = encoding
+        self._batch: List[bytes] = []
+        self._fd: Optional[int] = None  # opened on first write
+    
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._batch.append((self.format(record) + "\n").encode(self.encoding))
+            if len(self._batch) >= self._MAX_BATCH:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+    
+    def flush(self):
+        with self.lock:
+            if not self._batch:
+                return
+            if self._fd is None:
+                self._fd = os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            batch, self._batch = self._batch, []
+            written = os.writev(self._fd, batch) if hasattr(os, 'writev') else 0
+            if written < sum(map(len, batch)):
+                # No writev, or a short write: finish with plain writes
+                data = b"".join(batch)[written:]
+                while data:
+                    data = data[os.write(self._fd, data):]
+    
+    def close(self):
+        with self.lock:
+            try:
+                self.flush()
+            finally:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                super().close()
+
+
+class _LogRouter(logging.Handler):
+    """Dispatches queued records to the file handler of the logger that made them"""
+    
+    def __init__(self, pending: "queue.SimpleQueue"):
+        super().__init__()
+        self._pending = pending
+        self.handlers: Dict[str, _BatchedAppendHandler] = {}
+    
+    def emit(self, record: logging.LogRecord):
+        handler = self.handlers.get(record.name)
+        if handler is not None:
+            handler.handle(record)
+        if self._pending.empty():
+            for handler in self.handlers.values():
+                handler.flush()
+
+
+# One background writer serves every agent logger: all records share a
+# queue and the router sends each one to its logger's file handler
+_log_queue: "queue.SimpleQueue" = queue.SimpleQueue()
+_log_router = _LogRouter(_log_queue)
+_log_listener = QueueListener(_log_queue, _log_router)
+_log_listener_running = False
+
+
+def _set_log_handler(name: str, handler: Optional[_BatchedAppendHandler]):
+    """Replace (or with None, remove) a logger's file handler.
+
+    The writer thread is paused while handlers change, so records already
+    queued still reach the file they were logged to and the old file is
+    closed only once nothing can write to it.
+    """
+    global _log_listener_running
+    if _log_listener_running:
+        _log_listener.stop()
+        _log_listener_running = False
+    
+    old_handler = _log_router.handlers.pop(name, None)
+    if old_handler is not None:
+        old_handler.close()
+    if handler is not None:
+        _log_router.handlers[name] = handler
+    
+    if _log_router.handlers:
+        _log_listener.start()
+        _log_listener_running = True
+
+
+@atexit.register
+def _stop_log_writer():
+    """Flush every pending log record before the interpreter exits"""
+    for name in list(_log_router.handlers):
+        _set_log_handler(name, None)
+
+
 class LoggingManager:
     """Manages logging configuration for agents"""
     
@@ -118,12 +330,17 @@ class LoggingManager:
         # Remove existing handlers
         logger.handlers.clear()
         
-        # File handler
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
-        file_formatter = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
-        file_handler.setFormatter(file_formatter)
+        # File handler, fed from the shared queue by the background writer
+        # so that logging calls on the request path never wait on disk
+        # writes. A handler already open on the same file is reused.
+        file_handler = _log_router.handlers.get(logger.name)
+        if file_handler is None or file_handler.baseFilename != os.path.abspath(log_file):
+            file_handler = _BatchedAppendHandler(log_file)
+            file_formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            file_handler.setFormatter(file_formatter)
+            _set_log_handler(logger.name, file_handler)
         
         # Console handler (only warnings and errors)
         console_handler = logging.StreamHandler()
@@ -131,7 +348,7 @@ class LoggingManager:
         console_handler.setFormatter(console_formatter)
         console_handler.setLevel(logging.WARNING)
         
-        logger.addHandler(file_handler)
+        logger.addHandler(QueueHandler(_log_queue))
         logger.addHandler(console_handler)
         
         return logger
@@ -140,6 +357,12 @@ class LoggingManager:
 class APIKeyManager:
     """Manages API key storage and retrieval"""
     
+    # Parsed secrets files, keyed by path and valid while (mtime, size) match
+    _secrets_cache: Dict[Path, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+    
+    # .gitignore files already known to list secrets.json
+    _gitignores_covered: Set[str] = set()
+    
     @staticmethod
     def get_api_key(base_dir: Path, model: str) -> str:
         """Get API key from environment or secrets file, prompt if needed"""
@@ -150,17 +373,15 @@ class APIKeyManager:
 
         # Try secrets file
         secrets_file = base_dir / "secrets.json"
-        if secrets_file.exists():
-            try:
-                with open(secrets_file, 'r') as f:
-                    secrets = json.load(f)
-                    keys = secrets.get('keys', {})
-                    # Try model-specific key first, then default
-                    api_key = keys.get(model) or keys.get('default')
-                    if api_key:
-                        return api_key
-            except Exception:
-                pass
+        try:
+            secrets = APIKeyManager._load_secrets(secrets_file)
+            keys = secrets.get('keys', {})
+            # Try model-specific key first, then default
+            api_key = keys.get(model) or keys.get('default')
+            if api_key:
+                return api_key
+        except Exception:
+            pass
 
         # Prompt user for API key
         model_display = ModelRegistry.get_model_display_name(model)
@@ -176,6 +397,19 @@ class APIKeyManager:
         APIKeyManager.save_api_key(base_dir, api_key, model)
         return api_key
 
+    @staticmethod
+    def _load_secrets(secrets_file: Path) -> Dict[str, Any]:
+        """Parse the secrets file, reusing the last parse while the file is unchanged"""
+        st = secrets_file.stat()
+        version = (st.st_mtime_ns, st.st_size)
+        cached = APIKeyManager._secrets_cache.get(secrets_file)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        secrets = _loads(secrets_file.read_bytes())
+        APIKeyManager._secrets_cache[secrets_file] = (version, secrets)
+        return secrets
+
     @staticmethod
     def save_api_key(base_dir: Path, api_key: str, model: str):
         """Save API key to secrets file"""
@@ -190,8 +424,8 @@ class APIKeyManager:
         }
 
         try:
-            with open(secrets_file, 'w') as f:
-                json.dump(secrets, f, indent=2)
+            # Serialize up front so the file gets a single write
+            secrets_file.write_text(json.dumps(secrets, indent=2))
 
             # Add to .gitignore
             APIKeyManager._update_gitignore()
@@ -206,6 +440,10 @@ class APIKeyManager:
     def _update_gitignore():
         """Add secrets.json to .gitignore if not already present"""
         gitignore_file = Path('.gitignore')
+        gitignore_key = os.path.abspath(gitignore_file)
+        if gitignore_key in APIKeyManager._gitignores_covered:
+            return
+        
         gitignore_content = ""
         
         if gitignore_file.exists():
@@ -214,6 +452,7 @@ class APIKeyManager:
         if 'secrets.json' not in gitignore_content:
             with open(gitignore_file, 'a') as f:
                 f.write('\n# API Keys\n**/secrets.json\nsecrets.json\n')
+        APIKeyManager._gitignores_covered.add(gitignore_key)
 
 
 class FileManager:
@@ -226,7 +465,7 @@ class FileManager:
             filename = match.group(1)
             return FileManager._include_file(filename, base_dir, logger)
         
-        return re.sub(r'\{([^}]+)\}', replace_file, content)
+        return _INCLUDE_RE.sub(replace_file, content)
 
     @staticmethod
     def _include_file(filename: str, base_dir: Path, logger: logging.Logger) -> str:
@@ -236,7 +475,12 @@ class FileManager:
         
         for search_path in search_paths:
             file_path = search_path / filename
-            if file_path.exists() and file_path.is_file():
+            # One stat answers exists/is_file and supplies size and mtime
+            try:
+                file_stat = file_path.stat()
+            except (OSError, ValueError):
+                continue
+            if stat.S_ISREG(file_stat.st_mode):
                 
                 # Check if file is supported
                 if not ModelRegistry.is_supported_file(file_path):
@@ -246,18 +490,14 @@ class FileManager:
                 try:
                     # Check file size (limit to 2MB)
                     max_size = 2 * 1024 * 1024  # 2MB
-                    if file_path.stat().st_size > max_size:
+                    if file_stat.st_size > max_size:
                         logger.error(f"File {filename} too large (>2MB)")
                         return f"[ERROR: File {filename} too large (max 2MB)]"
                     
-                    # Try UTF-8 first
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            file_content = f.read()
-                    except UnicodeDecodeError:
-                        # Fallback to latin-1
-                        with open(file_path, 'r', encoding='latin-1') as f:
-                            file_content = f.read()
+                    if file_stat.st_size < _MMAP_MIN_SIZE:
+                        file_content = FileManager._read_small_text_file(str(file_path), file_stat.st_mtime_ns, file_stat.st_size)
+                    else:
+                        file_content = FileManager._read_text_file(str(file_path), file_stat.st_size)
                     
                     # Add file info header
                     file_info = FileManager._get_file_header(filename, file_path.suffix)
@@ -274,23 +514,41 @@ class FileManager:
         return f"[ERROR: File {filename} not found]"
 
     @staticmethod
+    @lru_cache(maxsize=8)
+    def _read_small_text_file(path: str, mtime_ns: int, size: int) -> str:
+        """Cached _read_text_file for files below _MMAP_MIN_SIZE, valid until their mtime or size changes"""
+        # Only small files are cached, so at most 8 files under 64 KiB are held
+        return FileManager._read_text_file(path, size)
+
+    @staticmethod
+    def _read_text_file(path: str, size: int) -> str:
+        """Read a file as text"""
+        # Read the bytes once so a failed UTF-8 decode doesn't reread the file
+        with open(path, 'rb') as f:
+            if size >= _MMAP_MIN_SIZE:
+                # Decode straight from the mapped pages, skipping the bytes copy
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as raw:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        raw.madvise(mmap.MADV_SEQUENTIAL)
+                    text = _decode_text(raw)
+            else:
+                text = _decode_text(f.read())
+        
+        # Match text-mode universal newline handling
+        if '\r' in text:
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    @staticmethod
+    @lru_cache(maxsize=256)
     def _get_file_header(filename: str, suffix: str) -> str:
         """Generate appropriate file header comment based on file type"""
         suffix = suffix.lower()
-        
-        if suffix in ['.py', '.r']:
-            return f"# File: {filename} ({suffix})\n"
-        elif suffix in ['.html', '.xml']:
-            return f"<!-- File: {filename} ({suffix}) -->\n"
-        elif suffix in ['.css', '.scss', '.sass']:
-            return f"/* File: {filename} ({suffix}) */\n"
-        elif suffix in ['.sql']:
-            return f"-- File: {filename} ({suffix})\n"
-        else:
-            return f"// File: {filename} ({suffix})\n"
+        template = _HEADER_TEMPLATES.get(suffix, _DEFAULT_HEADER_TEMPLATE)
+        return template.format(filename=filename, suffix=suffix)
 
     @staticmethod
-    def create_backup(base_dir: Path, filename: str = "history.json", max_backups: int = 10):
+    def create_backup(base_dir: Path, filename: str = "history.jsonl", max_backups: int = 10):
         """Create rolling backup of a file"""
         source_file = base_dir / filename
         backup_dir = base_dir / "backups"
@@ -299,35 +557,95 @@ class FileManager:
             return
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_file = backup_dir / f"{filename.replace('.json', '')}_{timestamp}.json"
+        stem, suffix = source_file.stem, source_file.suffix
+        backup_file = backup_dir / f"{stem}_{timestamp}{suffix}"
         
         try:
-            shutil.copy2(source_file, backup_file)
+            FileManager._copy_file(source_file, backup_file)
             
-            # Keep only last max_backups backups
-            backup_pattern = f"{filename.replace('.json', '')}_*.json"
-            backups = sorted(backup_dir.glob(backup_pattern))
-            while len(backups) > max_backups:
-                oldest = backups.pop(0)
-                oldest.unlink()
+            # Keep only last max_backups backups; names sort chronologically
+            # (copy2 keeps the source mtime, so mtimes can't be used here)
+            prefix = f"{stem}_"
+            with os.scandir(backup_dir) as entries:
+                backups = [entry.name for entry in entries
+                           if entry.name.startswith(prefix) and entry.name.endswith(suffix)]
+            excess = len(backups) - max_backups
+            if excess > 0:
+                for name in heapq.nsmallest(excess, backups):
+                    os.unlink(backup_dir / name)
                 
         except Exception as e:
             logging.error(f"Error creating backup: {e}")
 
+    @staticmethod
+    def _copy_file(source: Path, dest: Path):
+        """Copy with metadata, as a copy-on-write clone where the filesystem allows"""
+        # History is appended in place, so a hardlink would not be a snapshot
+        if fcntl is not None and sys.platform.startswith('linux'):
+            try:
+                with open(source, 'rb') as src, open(dest, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+                shutil.copystat(source, dest)
+                return
+            except OSError:
+                pass
+        
+        # copy2 already uses sendfile() for the data where available
+        shutil.copy2(source, dest)
+
     @staticmethod
     def list_available_files(base_dir: Path) -> List[str]:
         """List available files for inclusion"""
         files = []
         search_paths = [Path(p) for p in DEFAULT_SEARCH_PATHS] + [base_dir / 'uploads']
         
+        # Search paths usually nest ('.' contains 'src', ...), so directories
+        # are tracked by (device, inode) and each one is walked only once
+        # across all roots
+        visited = set()
+        
         for search_path in search_paths:
-            if search_path.exists():
-                for file_path in search_path.rglob("*"):
-                    if (file_path.is_file() and
-                        not file_path.name.startswith('.') and
-                        ModelRegistry.is_supported_file(file_path)):
+            try:
+                root_stat = search_path.stat()
+            except OSError:
+                continue
+            root_key = (root_stat.st_dev, root_stat.st_ino)
+            if not stat.S_ISDIR(root_stat.st_mode) or root_key in visited:
+                continue
+            visited.add(root_key)
+            
+            # Walk with os.scandir so type checks reuse the directory listing.
+            # Like rglob, directory symlinks are not followed and unreadable
+            # directories are skipped.
+            pending = [search_path]
+            while pending:
+                try:
+                    entries = os.scandir(pending.pop())
+                except OSError:
+                    continue
+                with entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            try:
+                                dir_stat = entry.stat(follow_symlinks=False)
+                            except OSError:
+                                continue
+                            dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+                            if dir_key not in visited:
+                                visited.add(dir_key)
+                                pending.append(entry.path)
+                            continue
+                        if entry.name.startswith('.') or not entry.is_file():
+                            continue
+                        
+                        file_path = Path(entry.path)
+                        if not ModelRegistry.is_supported_file(file_path):
+                            continue
                         
-                        size = file_path.stat().st_size
+                        try:
+                            size = entry.stat().st_size
+                        except OSError:
+                            continue
                         size_str = f"{size:,} bytes" if size < 1024*1024 else f"{size/(1024*1024):.1f} MB"
                         files.append(f"{file_path} ({size_str}) [{file_path.suffix}]")
         
@@ -342,27 +660,62 @@ class APIClient:
         self.model = model
         self.logger = logger
         self.api_url = "https://api.openai.com/v1/chat/completions"
+        
+        # One session for the client's lifetime keeps the TLS connection alive
+        # between turns; retries are handled in make_request, not by the adapter
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}"
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=0)
+        self.session.mount("https://", adapter)
+    
+    @property
+    def model(self) -> str:
+        return self._model
+    
+    @model.setter
+    def model(self, model: str):
+        # Per-model request settings are resolved once, not on every call
+        self._model = model
+        self._timeout = ModelRegistry.get_model_timeout(model)
+        self._model_display = ModelRegistry.get_model_display_name(model)
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def _retry_delay(self, status_code: int, attempt: int) -> Optional[int]:
+        """Seconds to wait before retrying a failed status, or None if it isn't retryable"""
+        if status_code == 401:
+            raise ValueError("Invalid API key")
+        elif status_code == 403:
+            raise ValueError("API access forbidden")
+        elif status_code == 429:
+            # Rate limited - wait and retry
+            delay = _RETRY_DELAYS[attempt]
+            self.logger.warning(f"Rate limited, retrying in {delay}s...")
+            return delay
+        elif status_code >= 500:
+            # Server error - retry
+            delay = _RETRY_DELAYS[attempt]
+            self.logger.warning(f"Server error {status_code}, retrying in {delay}s...")
+            return delay
+        return None
     
     def make_request(self, payload: Dict[str, Any]) -> requests.Response:
         """Make API request with retries and error handling"""
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}"
-        }
-        
-        timeout = ModelRegistry.get_model_timeout(self.model)
-        model_display = ModelRegistry.get_model_display_name(self.model)
-        
-        max_retries = 3
-        base_delay = 1
+        timeout = self._timeout
+        model_display = self._model_display
+        max_retries = len(_RETRY_DELAYS)
         
         for attempt in range(max_retries):
             try:
                 self.logger.info(f"Making API request to {model_display} (attempt {attempt + 1}/{max_retries}) with {timeout}s timeout...")
                 
-                response = requests.post(
+                response = self.session.post(
                     self.api_url,
-                    headers=headers,
                     json=payload,
                     stream=payload.get("stream", True),
                     timeout=timeout
@@ -371,82 +724,88 @@ class APIClient:
                 if response.status_code == 200:
                     self.logger.info("API request successful")
                     return response
-                elif response.status_code == 401:
-                    raise ValueError("Invalid API key")
-                elif response.status_code == 403:
-                    raise ValueError("API access forbidden")
-                elif response.status_code == 429:
-                    # Rate limited - wait and retry
-                    delay = base_delay * (2 ** attempt)
-                    self.logger.warning(f"Rate limited, retrying in {delay}s...")
-                    time.sleep(delay)
-                    continue
-                elif response.status_code >= 500:
-                    # Server error - retry
-                    delay = base_delay * (2 ** attempt)
-                    self.logger.warning(f"Server error {response.status_code}, retrying in {delay}s...")
+                
+                delay = self._retry_delay(response.status_code, attempt)
+                if delay is not None:
                     time.sleep(delay)
                     continue
-                else:
-                    response.raise_for_status()
+                response.raise_for_status()
                     
             except Timeout:
                 self.logger.warning(f"Request timed out after {timeout}s (attempt {attempt + 1}/{max_retries})")
                 if attempt == max_retries - 1:
                     raise Exception(f"Request timed out after {timeout}s.")
-                delay = base_delay * (2 ** attempt)
+                delay = _RETRY_DELAYS[attempt]
                 self.logger.warning(f"Retrying in {delay}s...")
                 time.sleep(delay)
             except RequestException as e:
                 if attempt == max_retries - 1:
                     raise
-                delay = base_delay * (2 ** attempt)
+                delay = _RETRY_DELAYS[attempt]
                 self.logger.warning(f"Request failed ({e}), retrying in {delay}s...")
                 time.sleep(delay)
         
         raise Exception(f"Failed to complete API request after {max_retries} attempts")
 
+    def _parse_stream_line(self, line: bytes) -> Tuple[str, bool]:
+        """Parse one raw Server-Sent Events line into (content, finished)"""
+        if not line or line.isspace():
+            return "", False
+        
+        try:
+            # Handle Server-Sent Events format; the JSON parser decodes the UTF-8
+            # payload and skips surrounding whitespace, so only the prefix is cut
+            if line.startswith(b"data: "):
+                data_bytes = line[6:]
+                
+                # No JSON payload can start with this, so a prefix test suffices
+                if data_bytes.startswith(b"[DONE]"):
+                    return "", True
+                
+                data = _loads(data_bytes)
+                
+                # Extract content from response
+                choices = data.get("choices", [])
+                if choices:
+                    choice = choices[0]
+                    delta = choice.get("delta", {})
+                    content = delta.get("content", "")
+                    
+                    # Check for completion
+                    return content or "", choice.get("finish_reason") == "stop"
+                    
+        except json.JSONDecodeError as e:
+            self.logger.warning(f"Invalid JSON in stream: {e}")
+        except Exception as e:
+            self.logger.warning(f"Error processing stream line: {e}")
+        
+        return "", False
+
+    def _parse_stream_lines(self, lines: List[bytes]) -> Tuple[str, bool]:
+        """Parse a batch of SSE lines into their joined content and a finished flag"""
+        parts = []
+        for line in lines:
+            content, finished = self._parse_stream_line(line)
+            if content:
+                parts.append(content)
+            if finished:
+                return "".join(parts), True
+        return "".join(parts), False
+
     def parse_streaming_response(self, response: requests.Response) -> Generator[str, None, None]:
         """Parse streaming Server-Sent Events response"""
         assistant_message = ""
         
         try:
-            for line in response.iter_lines(decode_unicode=True):
-                if not line or line.strip() == "":
-                    continue
-                
-                try:
-                    # Handle Server-Sent Events format
-                    if line.startswith("data: "):
-                        data_str = line[5:].strip()
-                        
-                        if data_str == "[DONE]":
-                            break
-                        
-                        data = json.loads(data_str)
-                        
-                        # Extract content from response
-                        choices = data.get("choices", [])
-                        if choices:
-                            choice = choices[0]
-                            delta = choice.get("delta", {})
-                            content = delta.get("content", "")
-                            
-                            if content:
-                                assistant_message += content
-                                yield content
-                            
-                            # Check for completion
-                            finish_reason = choice.get("finish_reason")
-                            if finish_reason == "stop":
-                                break
-                                
-                except json.JSONDecodeError as e:
-                    self.logger.warning(f"Invalid JSON in stream: {e}")
-                    continue
-                except Exception as e:
-                    self.logger.warning(f"Error processing stream line: {e}")
-                    continue
+            # One chunk per network read: deltas that arrived together are
+            # yielded together, and nothing received is held back
+            for lines in _iter_stream_batches(response):
+                content, finished = self._parse_stream_lines(lines)
+                if content:
+                    assistant_message += content
+                    yield content
+                if finished:
+                    break
                     
         except Exception as e:
             self.logger.error(f"Error parsing streaming response: {e}")
@@ -488,8 +847,9 @@ class ValidationUtils:
         if not agent_id:
             return False
         
-        # Allow alphanumeric, hyphens, and underscores
-        return bool(re.match(r'^[a-zA-Z0-9_-]+$', agent_id))
+        # Allow alphanumeric, hyphens, and underscores (a set test beats
+        # the regex engine's setup cost on strings this short)
+        return agent_id.isascii() and _AGENT_ID_CHARS.issuperset(agent_id)
     
     @staticmethod
     def validate_temperature(temperature: float) -> bool:
@@ -504,14 +864,16 @@ class ValidationUtils:
         return isinstance(max_tokens, int) and max_tokens > 0
 
 
+# (divisor, unit) for sizes of at least 1 KB, indexed by "is it at least 1 MB"
+_SIZE_UNITS = ((1024, "KB"), (1 << 20, "MB"))
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human readable format"""
     if size_bytes < 1024:
         return f"{size_bytes} bytes"
-    elif size_bytes < 1024 * 1024:
-        return f"{size_bytes / 1024:.1f} KB"
-    else:
-        return f"{size_bytes / (1024 * 1024):.1f} MB"
+    divisor, unit = _SIZE_UNITS[size_bytes >= 1 << 20]
+    return f"{size_bytes / divisor:.1f} {unit}"
 
 
 def format_duration(seconds: float) -> str:
@@ -519,10 +881,23 @@ def format_duration(seconds: float) -> str:
     if seconds < 60:
         return f"{seconds:.0f}s"
     elif seconds < 3600:
-        minutes = seconds // 60
-        remaining_seconds = seconds % 60
+        minutes, remaining_seconds = divmod(seconds, 60)
         return f"{minutes:.0f}m {remaining_seconds:.0f}s"
     else:
-        hours = seconds // 3600
-        remaining_minutes = (seconds % 3600) // 60
-        return f"{hours:.0f}h {remaining_minutes:.0f}m"
\ No newline at end of file
+        hours, remainder = divmod(seconds, 3600)
+        return f"{hours:.0f}h {remainder // 60:.0f}m"
+
+
+@lru_cache(maxsize=1024)
+def format_clock_time(iso_timestamp: str) -> str:
+    """Format an ISO timestamp as HH:MM:SS (cached per timestamp)"""
+    return datetime.fromisoformat(iso_timestamp).strftime("%H:%M:%S")
+
+
+@lru_cache(maxsize=256)
+def format_short_datetime(iso_timestamp: str) -> str:
+    """Format an ISO timestamp as 'YYYY-MM-DD HH:MM', or return it unchanged if unparsable"""
+    try:
+        return datetime.fromisoformat(iso_timestamp).strftime("%Y-%m-%d %H:%M")
+    except (ValueError, TypeError):
+        return iso_timestamp